@@ -1,7 +1,14 @@
+import profiling
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
+import asyncio
+import time
 import pyodbc
-from datetime import datetime
+from datetime import datetime, timedelta
+from async_db import AsyncDataAccess, TkAsyncRunner
+from connection import ConnectionManager, ConnectionSettings, ConnectionUnavailable, load_settings
+from gym_stats import AGE_BANDS, MembershipStats, age_band_sql
+from gym_tasks import NoTrainers, build_duplicate_index, duplicate_report, plan_week
 
 
 
@@ -28,6 +35,13 @@ def validate_input(name, age, phone):
 
 
 
+MEMBERSHIP_FEES = {
+    "Basic": 1000,
+    "Standard": 2000,
+    "Premium": 3500
+}
+
+
 class Member:
     """Member class representing a gym member"""
     
@@ -43,12 +57,7 @@ class Member:
         return f"{self.name} - {self.membership_type} - Age: {self.age}"
     
     def calculate_fee(self):
-        fees = {
-            "Basic": 1000,
-            "Standard": 2000,
-            "Premium": 3500
-        }
-        return fees.get(self.membership_type, 0)
+        return MEMBERSHIP_FEES.get(self.membership_type, 0)
 
 
 class Trainer:
@@ -74,17 +83,21 @@ class ValidationError(Exception):
 
 SQL_SERVER = "DESKTOP-M1HTQTV"
 DB_NAME = "GymDB"
-CONN_STR_TEMPLATE = (
-    "DRIVER={SQL Server};"
-    f"SERVER={SQL_SERVER};"
-    "Trusted_Connection=yes;"
+# Override in the [gym] section of db.ini or with GYM_DB_* environment
+# variables, e.g. GYM_DB_SERVERS="PRIMARY-SQL, BACKUP-SQL"
+DEFAULT_SETTINGS = ConnectionSettings(
+    servers=[SQL_SERVER],
+    database=DB_NAME,
+    driver="SQL Server",
 )
 
 class Database:
     
     
-    def __init__(self, db_name=DB_NAME):
-        self.db_name = db_name
+    def __init__(self, db_name=None, settings=None):
+        settings = settings or load_settings("gym", DEFAULT_SETTINGS)
+        self.db_name = db_name or settings.database
+        self.connections = ConnectionManager(settings, connect=pyodbc.connect)
         try:
         
             self.ensure_database_exists()
@@ -95,21 +108,19 @@ class Database:
     def get_connection(self, use_db=True):
         
         try:
-            if use_db:
-                conn_str = CONN_STR_TEMPLATE + f"DATABASE={self.db_name};"
-            else:
-                conn_str = CONN_STR_TEMPLATE + "DATABASE=master;"
-            conn = pyodbc.connect(conn_str, autocommit=False)
-            return conn
-        except pyodbc.Error as e:
+            database = self.db_name if use_db else "master"
+            return self.connections.connect(database, autocommit=False)
+        except (pyodbc.Error, ConnectionUnavailable) as e:
             raise DatabaseError(f"Failed to connect to SQL Server: {e}")
     
     def ensure_database_exists(self):
         
         try:
         
-            conn_str = CONN_STR_TEMPLATE + "DATABASE=master;"
-            conn = pyodbc.connect(conn_str, autocommit=True)
+            try:
+                conn = self.connections.connect("master", autocommit=True)
+            except ConnectionUnavailable as e:
+                raise DatabaseError(f"Failed to connect to SQL Server: {e}")
             cur = conn.cursor()
 
             cur.execute("SELECT database_id FROM sys.databases WHERE Name = ?", (self.db_name,))
@@ -153,6 +164,26 @@ class Database:
                 );
             """)
             
+            
+            cur.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[training_sessions]') AND type in (N'U'))
+                BEGIN
+                    CREATE TABLE dbo.training_sessions (
+                        id INT IDENTITY(1,1) PRIMARY KEY,
+                        trainer_id INT NOT NULL REFERENCES dbo.trainers(id) ON DELETE CASCADE,
+                        member_id INT NOT NULL REFERENCES dbo.members(id) ON DELETE CASCADE,
+                        start_time DATETIME2(0) NOT NULL,
+                        end_time DATETIME2(0) NOT NULL
+                    );
+                    CREATE INDEX IX_training_sessions_trainer_start
+                        ON dbo.training_sessions (trainer_id, start_time) INCLUDE (end_time);
+                    CREATE INDEX IX_training_sessions_member_start
+                        ON dbo.training_sessions (member_id, start_time) INCLUDE (end_time);
+                    CREATE INDEX IX_training_sessions_start
+                        ON dbo.training_sessions (start_time) INCLUDE (trainer_id, member_id, end_time);
+                END
+            """)
+            
             conn.commit()
             cur.close()
             conn.close()
@@ -194,16 +225,128 @@ class Database:
             raise DatabaseError(f"Failed to retrieve members: {e}")
     
     def delete_member(self, member_id):
+        """Delete a member and return its (age, membership_type, join_date), or None"""
         try:
             conn = self.get_connection(use_db=True)
             cur = conn.cursor()
-            cur.execute("DELETE FROM dbo.members WHERE id = ?;", (member_id,))
+            cur.execute("""
+                DELETE FROM dbo.members
+                OUTPUT deleted.age, deleted.membership_type, CONVERT(varchar(10), deleted.join_date, 120)
+                WHERE id = ?;
+            """, (member_id,))
+            row = cur.fetchone()
             conn.commit()
             cur.close()
             conn.close()
+            return tuple(row) if row else None
         except pyodbc.Error as e:
             raise DatabaseError(f"Failed to delete member: {e}")
     
+    def add_trainer(self, trainer):
+        try:
+            conn = self.get_connection(use_db=True)
+            cur = conn.cursor()
+            cur.execute("""
+                INSERT INTO dbo.trainers (name, specialization)
+                VALUES (?, ?);
+            """, (trainer.name, trainer.specialization))
+            
+            cur.execute("SELECT SCOPE_IDENTITY();")
+            row = cur.fetchone()
+            conn.commit()
+            new_id = int(row[0]) if row and row[0] is not None else None
+            cur.close()
+            conn.close()
+            return new_id
+        except pyodbc.Error as e:
+            raise DatabaseError(f"Failed to add trainer: {e}")
+    
+    def get_all_trainers(self):
+        try:
+            conn = self.get_connection(use_db=True)
+            cur = conn.cursor()
+            cur.execute("SELECT id, name, specialization FROM dbo.trainers ORDER BY id;")
+            rows = cur.fetchall()
+            cur.close()
+            conn.close()
+            return [tuple(r) for r in rows]
+        except pyodbc.Error as e:
+            raise DatabaseError(f"Failed to retrieve trainers: {e}")
+    
+    def add_sessions(self, sessions):
+        """Insert (trainer_id, member_id, start, end) sessions in one transaction.
+        
+        Each row is re-checked against stored sessions under UPDLOCK/HOLDLOCK,
+        so a concurrent scheduler cannot slip in an overlap. Rows that would
+        overlap are skipped; returns the sessions that were saved.
+        """
+        try:
+            conn = self.get_connection(use_db=True)
+            cur = conn.cursor()
+            saved = []
+            for s in sessions:
+                trainer_id, member_id, start, end = tuple(s)
+                cur.execute("""
+                    INSERT INTO dbo.training_sessions (trainer_id, member_id, start_time, end_time)
+                    SELECT ?, ?, ?, ?
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM dbo.training_sessions WITH (UPDLOCK, HOLDLOCK)
+                        WHERE (trainer_id = ? OR member_id = ?)
+                          AND start_time < ? AND end_time > ?
+                    );
+                """, (trainer_id, member_id, start, end, trainer_id, member_id, end, start))
+                if cur.rowcount:
+                    saved.append(s)
+            conn.commit()
+            cur.close()
+            conn.close()
+            return saved
+        except pyodbc.Error as e:
+            raise DatabaseError(f"Failed to save sessions: {e}")
+    
+    def get_sessions(self, start, end):
+        """Sessions overlapping [start, end) as (trainer_id, member_id, start, end)"""
+        try:
+            conn = self.get_connection(use_db=True)
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT trainer_id, member_id, start_time, end_time
+                FROM dbo.training_sessions
+                WHERE start_time < ? AND end_time > ?
+                ORDER BY start_time;
+            """, (end, start))
+            rows = cur.fetchall()
+            cur.close()
+            conn.close()
+            return [tuple(r) for r in rows]
+        except pyodbc.Error as e:
+            raise DatabaseError(f"Failed to retrieve sessions: {e}")
+    
+    def get_membership_aggregates(self):
+        """Member counts by type, join month and age band, grouped on the server"""
+        try:
+            conn = self.get_connection(use_db=True)
+            cur = conn.cursor()
+            cur.execute("SELECT membership_type, COUNT(*) FROM dbo.members GROUP BY membership_type;")
+            by_type = dict(cur.fetchall())
+            cur.execute("""
+                SELECT CONVERT(varchar(7), join_date, 120), COUNT(*)
+                FROM dbo.members
+                GROUP BY CONVERT(varchar(7), join_date, 120);
+            """)
+            by_month = dict(cur.fetchall())
+            cur.execute(f"""
+                SELECT band, COUNT(*)
+                FROM (SELECT {age_band_sql()} AS band FROM dbo.members) AS banded
+                GROUP BY band;
+            """)
+            by_age_band = dict(cur.fetchall())
+            cur.close()
+            conn.close()
+            return {"by_type": by_type, "by_month": by_month, "by_age_band": by_age_band}
+        except pyodbc.Error as e:
+            raise DatabaseError(f"Failed to load membership statistics: {e}")
+    
     def search_members(self, search_term):
         try:
             conn = self.get_connection(use_db=True)
@@ -232,14 +375,31 @@ class GymManagementGUI:
         self.root.title("Gym Management System")
         self.root.geometry("900x600")
         
-        try:
-            self.db = Database()
-        except DatabaseError as e:
+        # Connecting can take the whole login timeout, so it runs on the
+        # worker pool; calls queued meanwhile wait for it
+        self.db = None
+        self.data = AsyncDataAccess()
+        self.runner = TkAsyncRunner(self.root)
+        start = time.perf_counter()
+
+        def connected(db):
+            profiling.tracer.mark("db init", start)
+            self.db = db
+
+        def failed(e):
             messagebox.showerror("DB Error", str(e))
-            exit()
+            self.runner.close()
+            self.root.destroy()
+        self.runner.submit(self.data.open(Database), connected, failed)
+        self.pending_search = None
+        self.dup_index = None
+        self.stats = None
         
         self.setup_gui()
         self.load_members()
+        self.runner.submit(build_duplicate_index(self.data),
+                           on_success=lambda index: setattr(self, "dup_index", index))
+        self.refresh_stats()
     
     def setup_gui(self):
         # Title
@@ -288,6 +448,15 @@ class GymManagementGUI:
         tk.Button(btn_frame, text="Clear", bg="#7f8c8d", fg="white",
                 command=self.clear_form, pady=5).pack(side=tk.LEFT, padx=5)
         
+        tk.Button(left, text="Dashboard", bg="#2980b9", fg="white",
+                command=self.show_dashboard, pady=5).grid(row=6, column=0, columnspan=2, pady=5)
+        
+        tk.Button(left, text="Add Trainer", bg="#16a085", fg="white",
+                command=self.add_trainer, pady=5).grid(row=7, column=0, pady=5)
+        
+        tk.Button(left, text="Schedule Next Week", bg="#d35400", fg="white",
+                command=self.schedule_week, pady=5).grid(row=7, column=1, pady=5)
+        
         # Fee label
         self.fee_label = tk.Label(left, text="Monthly Fee: Rs. 1000",
                                 font=("Arial", 11, "bold"), fg="#e74c3c")
@@ -325,8 +494,14 @@ class GymManagementGUI:
         
         self.tree.pack(fill=tk.BOTH, expand=True)
         
-        tk.Button(right, text="Delete Selected", bg="#c0392b", fg="white",
-                command=self.delete_member, pady=5).pack(pady=10)
+        r_btns = tk.Frame(right)
+        r_btns.pack(pady=10)
+        
+        tk.Button(r_btns, text="Delete Selected", bg="#c0392b", fg="white",
+                command=self.delete_member, pady=5).pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(r_btns, text="Find Duplicates", bg="#8e44ad", fg="white",
+                command=self.show_duplicates, pady=5).pack(side=tk.LEFT, padx=5)
     
 
     
@@ -342,18 +517,29 @@ class GymManagementGUI:
                 raise ValidationError("\n".join(errors))
             
             member = Member(None, name, int(age), phone, membership)
-            member_id = self.db.add_member(member)
+        except ValidationError as e:
+            messagebox.showerror("Validation Error", str(e))
+            return
+        
+        if self.dup_index is not None:
+            matches = self.dup_index.check(name, phone)
+            if matches:
+                ids = ", ".join(str(m[0]) for m in matches[:5])
+                if not messagebox.askyesno("Possible Duplicate",
+                                           f"This looks like existing member ID {ids}.\nAdd anyway?"):
+                    return
+        
+        def added(member_id):
             member.member_id = member_id
-            
+            if self.dup_index is not None:
+                self.dup_index.add(member_id, name, phone)
+            if self.stats is not None:
+                self.stats.apply(member.age, member.membership_type, member.join_date)
             self.load_members()
             self.clear_form()
-            
             messagebox.showinfo("Success", f"Member added!\nFee: Rs. {member.calculate_fee()}")
         
-        except ValidationError as e:
-            messagebox.showerror("Validation Error", str(e))
-        except DatabaseError as e:
-            messagebox.showerror("Database Error", str(e))
+        self.run_async("add_member", member, on_success=added)
     
     def delete_member(self):
         selected = self.tree.selection()
@@ -365,23 +551,132 @@ class GymManagementGUI:
         member_id = item["values"][0]
         
         if messagebox.askyesno("Confirm", "Delete this member?"):
-            self.db.delete_member(member_id)
-            self.load_members()
+            def deleted(row):
+                if self.dup_index is not None:
+                    self.dup_index.remove(member_id)
+                if self.stats is not None and row is not None:
+                    self.stats.apply(*row, delta=-1)
+                self.load_members()
+            
+            self.run_async("delete_member", member_id, on_success=deleted)
+    
+    def show_duplicates(self):
+        def show(report):
+            win = tk.Toplevel(self.root)
+            win.title("Possible Duplicates")
+            win.geometry("520x320")
+            cols = ("ID", "Name", "ID 2", "Name 2", "Score")
+            tree = ttk.Treeview(win, columns=cols, show="headings")
+            for col, w in zip(cols, (40, 160, 40, 160, 60)):
+                tree.heading(col, text=col)
+                tree.column(col, width=w)
+            tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+            for row in report:
+                tree.insert("", tk.END, values=row)
+            if not report:
+                messagebox.showinfo("Duplicates", "No likely duplicates found", parent=win)
+        
+        self.runner.submit(duplicate_report(self.data), on_success=show,
+                           on_error=lambda e: messagebox.showerror("Database Error", str(e)))
     
     def search_members(self, event=None):
+        # Each keystroke supersedes the previous search
+        if self.pending_search is not None:
+            self.pending_search.cancel()
+        
         text = self.search_entry.get().strip()
         if text == "":
-            self.load_members()
+            self.pending_search = self.load_members()
             return
         
-        members = self.db.search_members(text)
-        self.display_members(members)
+        self.pending_search = self.run_async("search_members", text,
+                                             on_success=self.display_members)
     
     def update_fee(self, event=None):
-        fees = {"Basic": 1000, "Standard": 2000, "Premium": 3500}
-        fee = fees.get(self.membership_var.get(), 1000)
+        fee = MEMBERSHIP_FEES.get(self.membership_var.get(), 1000)
         self.fee_label.config(text=f"Monthly Fee: Rs. {fee}")
     
+    def add_trainer(self):
+        name = simpledialog.askstring("Add Trainer", "Trainer name:", parent=self.root)
+        if not name or len(name.strip()) < 2:
+            return
+        specialization = simpledialog.askstring("Add Trainer", "Specialization:", parent=self.root)
+        if not specialization or not specialization.strip():
+            return
+        
+        trainer = Trainer(None, name.strip(), specialization.strip())
+        
+        def added(trainer_id):
+            trainer.trainer_id = trainer_id
+            messagebox.showinfo("Success", f"Trainer added: {trainer.get_info()}")
+        
+        self.run_async("add_trainer", trainer, on_success=added)
+    
+    def schedule_week(self):
+        today = datetime.now()
+        week_start = datetime(today.year, today.month, today.day) + timedelta(days=7 - today.weekday())
+        
+        def done(result):
+            booked, unplaced = result
+            text = f"Booked {booked} sessions for the week of {week_start:%Y-%m-%d}"
+            if unplaced:
+                text += f"\n{unplaced} members could not be placed"
+            messagebox.showinfo("Schedule", text)
+        
+        def failed(e):
+            if isinstance(e, NoTrainers):
+                messagebox.showwarning("Schedule", str(e))
+            else:
+                messagebox.showerror("Database Error", str(e))
+        
+        self.runner.submit(plan_week(self.data, week_start), on_success=done, on_error=failed)
+    
+    def refresh_stats(self, on_success=None):
+        def loaded(aggregates):
+            self.stats = MembershipStats.from_aggregates(MEMBERSHIP_FEES, aggregates)
+            if on_success:
+                on_success()
+        
+        self.run_async("get_membership_aggregates", on_success=loaded)
+    
+    def show_dashboard(self):
+        if self.stats is None:
+            self.refresh_stats(on_success=self.show_dashboard)
+            return
+        
+        stats = self.stats
+        win = tk.Toplevel(self.root)
+        win.title("Membership Dashboard")
+        win.geometry("460x520")
+        
+        tk.Label(win, text=f"Members: {stats.total}    Monthly Revenue: Rs. {stats.monthly_revenue}",
+                font=("Arial", 12, "bold")).pack(pady=10)
+        
+        def table(title, columns, rows):
+            frame = tk.LabelFrame(win, text=title, font=("Arial", 10, "bold"), padx=8, pady=4)
+            frame.pack(fill=tk.X, padx=10, pady=4)
+            tree = ttk.Treeview(frame, columns=columns, show="headings", height=min(len(rows), 6) or 1)
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=120)
+            for row in rows:
+                tree.insert("", tk.END, values=row)
+            tree.pack(fill=tk.X)
+        
+        revenue = stats.revenue_by_type()
+        table("By Membership Type", ("Type", "Members", "Revenue"),
+              [(t, n, revenue[t]) for t, n in sorted(stats.by_type.items())])
+        table("Join Month (last 12)", ("Month", "Members"),
+              sorted(stats.by_month.items(), reverse=True)[:12])
+        table("Age Band", ("Band", "Members"),
+              [(label, stats.by_age_band.get(label, 0)) for label, _, _ in AGE_BANDS])
+        
+        def refresh():
+            win.destroy()
+            self.refresh_stats(on_success=self.show_dashboard)
+        
+        tk.Button(win, text="Refresh", command=refresh).pack(pady=8)
+    
     
     
     def clear_form(self):
@@ -392,8 +687,23 @@ class GymManagementGUI:
         self.update_fee()
     
     def load_members(self):
-        members = self.db.get_all_members()
-        self.display_members(members)
+        start = time.perf_counter()
+
+        def show(members):
+            profiling.tracer.mark("first query", start)
+            self.display_members(members)
+        return self.run_async("get_all_members", on_success=show)
+    
+    def run_async(self, method, *args, on_success=None):
+        """Run a Database method off the Tk thread and report failures."""
+        def on_error(e):
+            if self.data.backend is None:
+                return  # the failed connection is reported once, by __init__
+            if isinstance(e, asyncio.TimeoutError):
+                messagebox.showerror("Database Error", "The database did not respond in time.")
+            else:
+                messagebox.showerror("Database Error", str(e))
+        return self.runner.submit(self.data.call(method, *args), on_success, on_error)
     
     def display_members(self, members):
         self.tree.delete(*self.tree.get_children())
@@ -402,6 +712,10 @@ class GymManagementGUI:
 
 
 if __name__ == "__main__":
+    import sys
+    profiling.configure(sys.argv[1:])
+    profiling.tracer.mark("import")
     root = tk.Tk()
     app = GymManagementGUI(root)
+    profiling.tracer.first_paint(root)
     root.mainloop()
@@ -0,0 +1,130 @@
+"""Non-blocking access to the blocking pyodbc data layers.
+
+AsyncDataAccess runs methods of a blocking backend (scdlec8.StudentStore,
+GymManagementSystem.Database, or a stand-in from standin.py) on a bounded
+thread pool, with a per-call timeout. TkAsyncRunner runs an asyncio loop
+next to the Tk main loop and hands results back on the Tk thread, so a
+slow query never freezes the window.
+"""
+import asyncio
+import functools
+import queue
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_WORKERS = 4
+
+
+class AsyncDataAccess:
+    def __init__(self, backend=None, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+        """backend may be None and created later with open()."""
+        self.backend = backend
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="db")
+        self._opening = None
+
+    async def open(self, factory, *args):
+        """Create the backend with factory(*args) on the pool.
+
+        Constructors that connect to a server can then run off the Tk
+        thread. Calls made meanwhile wait for it, and fail with the same
+        error if it fails.
+        """
+        self._opening = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(factory, *args)
+        )
+        self.backend = await self._opening
+        return self.backend
+
+    async def call(self, method, *args, timeout=None):
+        """Run backend.method(*args) on the pool.
+
+        Raises asyncio.TimeoutError when the call (including time spent
+        queued behind other calls) exceeds the timeout. A call that is
+        cancelled or times out before a worker picks it up never runs; one
+        already running is left to finish and its result is discarded.
+        """
+        if self.backend is None:
+            if self._opening is None:
+                raise RuntimeError("No backend; call open() first")
+            await asyncio.shield(self._opening)
+        func = functools.partial(getattr(self.backend, method), *args)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func)
+        return await asyncio.wait_for(future, timeout or self.timeout)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TkAsyncRunner:
+    """Drives an asyncio loop in a background thread for a Tk app.
+
+    submit() schedules a coroutine and returns a concurrent.futures.Future
+    that can be cancelled. Callbacks run on the Tk thread, picked up by a
+    short root.after poll.
+    """
+
+    def __init__(self, root, poll_interval=20):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.loop = asyncio.new_event_loop()
+        self._completed = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, coro, on_success=None, on_error=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(
+            lambda f: self._completed.put((f, on_success, on_error))
+        )
+        return future
+
+    def drain(self):
+        """Run callbacks for every finished coroutine; called on the Tk thread."""
+        while not self._closed:
+            try:
+                future, on_success, on_error = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            if future.cancelled():
+                continue
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_success:
+                        on_success(future.result())
+                elif on_error:
+                    on_error(error)
+            except Exception:
+                # One broken callback must not stop the others
+                self._report(*sys.exc_info())
+
+    def _report(self, exc, value, tb):
+        report = getattr(self.root, "report_callback_exception", None)
+        if report is not None:
+            report(exc, value, tb)
+        else:
+            traceback.print_exception(exc, value, tb)
+
+    def _poll(self):
+        try:
+            self.drain()
+        finally:
+            if not self._closed:
+                self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def close(self):
+        """Stop the loop; may be called from a callback run by drain()."""
+        if self._closed:
+            return
+        self._closed = True
+        self.root.after_cancel(self._after_id)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
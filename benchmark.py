@@ -0,0 +1,356 @@
+"""Reproducible performance benchmarks.
+
+Usage:
+    python benchmark.py --scale 1k --scale 100k
+    python benchmark.py --scale 1k --save-baseline
+    python benchmark.py --scale 1k --baseline bench_baseline.json
+
+Every data set comes from a seeded generator, so two runs with the same
+seed and scale work on identical rows. Results are written as JSON and,
+when a baseline is given, any case slower than the baseline by more than
+the tolerance is reported and the process exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from db import DatabaseHandler
+from dedup import find_duplicates
+from journal import OperationJournal
+from scheduler import TrainerScheduler, week_slots
+from logic import BudgetManager, RecurringRule, SavingsManager, recurring_transactions
+from snapshot import export_snapshot, load_snapshot
+from standin import LocalGymDatabase, LocalStudentStore
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SEED = 42
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_BASELINE = "bench_baseline.json"
+
+# Per-row insert paths commit on every call, so they are timed on a
+# sample and the rest of the data set is bulk loaded.
+INSERT_SAMPLE = 5_000
+
+# Recurring rules projected over PROJECTION_MONTHS, independent of scale
+RECURRING_RULES = 1_000
+PROJECTION_MONTHS = 120
+
+CATEGORIES = [
+    "Food", "Rent", "Transport",
+    "Shopping", "Utilities",
+    "Entertainment", "Salary", "Other"
+]
+MEMBERSHIP_TYPES = ["Basic", "Standard", "Premium"]
+SPECIALIZATIONS = ["Cardio", "Strength", "Yoga", "CrossFit", "Boxing", "Pilates"]
+GRADES = ["A", "B", "C", "D", "F"]
+FIRST_NAMES = [
+    "Ali", "Sara", "Ahmed", "Fatima", "Zain", "Ayesha", "Omar", "Hina",
+    "Bilal", "Maryam", "Usman", "Noor", "Hamza", "Iqra", "Hassan", "Sana"
+]
+LAST_NAMES = [
+    "Khan", "Ahmed", "Malik", "Hussain", "Sheikh", "Butt", "Qureshi",
+    "Raza", "Iqbal", "Chaudhry", "Mirza", "Siddiqui"
+]
+EPOCH = date(2020, 1, 1)
+
+TransactionRow = namedtuple("TransactionRow", "t_type category amount date")
+BudgetRow = namedtuple("BudgetRow", "category limit_amount")
+MemberRow = namedtuple("MemberRow", "name age phone membership_type join_date")
+TrainerRow = namedtuple("TrainerRow", "name specialization")
+StudentRow = namedtuple("StudentRow", "name age grade")
+RuleRow = namedtuple("RuleRow", "t_type category amount start rrule")
+
+
+# ---------- Synthetic data generators ----------
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _date(rng, days=6 * 365):
+    return (EPOCH + timedelta(days=rng.randrange(days))).strftime("%Y-%m-%d")
+
+
+def generate_transactions(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    for _ in range(n):
+        if rng.random() < 0.2:
+            yield TransactionRow("Income", "Salary", round(rng.uniform(20_000, 200_000), 2), _date(rng))
+        else:
+            yield TransactionRow("Expense", rng.choice(CATEGORIES), round(rng.uniform(50, 20_000), 2), _date(rng))
+
+
+def generate_budgets(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    for i in range(n):
+        category = CATEGORIES[i] if i < len(CATEGORIES) else f"Category{i}"
+        yield BudgetRow(category, round(rng.uniform(1_000, 500_000), 2))
+
+
+def generate_members(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    for _ in range(n):
+        phone = "03" + "".join(str(rng.randrange(10)) for _ in range(9))
+        yield MemberRow(_name(rng), rng.randint(10, 100), phone,
+                        rng.choice(MEMBERSHIP_TYPES), _date(rng))
+
+
+def generate_trainers(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield TrainerRow(_name(rng), rng.choice(SPECIALIZATIONS))
+
+
+def generate_students(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield StudentRow(_name(rng), rng.randint(5, 25), rng.choice(GRADES))
+
+
+def generate_rules(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    for _ in range(n):
+        rrule = rng.choice([
+            "FREQ=MONTHLY", "FREQ=MONTHLY;BYMONTHDAY=-1", "FREQ=WEEKLY",
+            "FREQ=WEEKLY;INTERVAL=2", "FREQ=DAILY;INTERVAL=3", "FREQ=YEARLY",
+        ])
+        if rng.random() < 0.3:
+            rrule += f";COUNT={rng.randint(1, 200)}"
+        if rng.random() < 0.2:
+            yield RuleRow("Income", "Salary", round(rng.uniform(20_000, 200_000), 2), _date(rng), rrule)
+        else:
+            yield RuleRow("Expense", rng.choice(CATEGORIES), round(rng.uniform(50, 20_000), 2), _date(rng), rrule)
+
+
+# ---------- Timing ----------
+def measure(func, repeat=3):
+    """Run func repeat times and return (median seconds, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def record(results, scale, name, seconds, ops):
+    results[f"{scale}/{name}"] = {
+        "seconds": seconds,
+        "ops": ops,
+        "ops_per_sec": ops / seconds if seconds else None,
+    }
+
+
+# ---------- Cases ----------
+def bench_finance(results, scale, n, seed, workdir):
+    path = os.path.join(workdir, f"finance_{scale}.db")
+    db = DatabaseHandler(path)
+    budgets = BudgetManager(db)
+    savings = SavingsManager(db)
+    rows = generate_transactions(n, seed)
+
+    sample = min(n, INSERT_SAMPLE)
+    start = time.perf_counter()
+    for _ in range(sample):
+        db.add_transaction(*next(rows))
+    record(results, scale, "finance.add_transaction", time.perf_counter() - start, sample)
+
+    start = time.perf_counter()
+    db.conn.executemany(
+        "INSERT INTO transactions (type, category, amount, date) VALUES (?, ?, ?, ?)",
+        rows
+    )
+    db.conn.commit()
+    record(results, scale, "finance.bulk_load", time.perf_counter() - start, n - sample)
+
+    budget_rows = list(generate_budgets(len(CATEGORIES), seed))
+    seconds, _ = measure(lambda: [budgets.set_budget(*b) for b in budget_rows], repeat=1)
+    record(results, scale, "budget.set_budget", seconds, len(budget_rows))
+
+    seconds, _ = measure(lambda: db.fetch_transactions())
+    record(results, scale, "finance.fetch_transactions", seconds, n)
+
+    seconds, _ = measure(lambda: db.get_total_by_type("Expense"))
+    record(results, scale, "finance.get_total_by_type", seconds, 1)
+
+    seconds, _ = measure(lambda: [db.get_category_expense(c) for c in CATEGORIES])
+    record(results, scale, "finance.get_category_expense", seconds, len(CATEGORIES))
+
+    seconds, _ = measure(lambda: [budgets.is_over_budget(c) for c in CATEGORIES])
+    record(results, scale, "budget.is_over_budget", seconds, len(CATEGORIES))
+
+    seconds, _ = measure(savings.calculate_savings)
+    record(results, scale, "savings.calculate_savings", seconds, 1)
+
+    snap_path = os.path.join(workdir, f"finance_{scale}.snap")
+    seconds, _ = measure(lambda: export_snapshot(db, snap_path), repeat=1)
+    record(results, scale, "snapshot.export", seconds, n)
+
+    def load():
+        load_snapshot(snap_path).close()
+    seconds, _ = measure(load)
+    record(results, scale, "snapshot.load", seconds, 1)
+
+    rules = [RecurringRule.from_rrule(*r) for r in generate_rules(RECURRING_RULES, seed)]
+    seconds, _ = measure(lambda: savings.project(PROJECTION_MONTHS, "2026-01-01", rules))
+    record(results, scale, "savings.project", seconds, RECURRING_RULES)
+
+    seconds, count = measure(lambda: sum(1 for _ in recurring_transactions(rules, "2026-01-01", "2026-12-31")))
+    record(results, scale, "recurring.transactions_1y", seconds, count)
+
+    journal = OperationJournal(db)
+    imported = list(generate_transactions(n, seed + 1))
+    seconds, _ = measure(lambda: journal.import_transactions(imported), repeat=1)
+    record(results, scale, "journal.import", seconds, n)
+
+    seconds, _ = measure(journal.undo, repeat=1)
+    record(results, scale, "journal.undo", seconds, n)
+
+    seconds, _ = measure(journal.redo, repeat=1)
+    record(results, scale, "journal.redo", seconds, n)
+
+    db.close()
+
+
+def bench_gym(results, scale, n, seed, workdir):
+    path = os.path.join(workdir, f"gym_{scale}.db")
+    db = LocalGymDatabase(path)
+    members = generate_members(n, seed)
+
+    sample = min(n, INSERT_SAMPLE)
+    start = time.perf_counter()
+    for _ in range(sample):
+        db.add_member(next(members))
+    record(results, scale, "gym.add_member", time.perf_counter() - start, sample)
+
+    db.add_members(members)
+
+    seconds, _ = measure(db.get_all_members)
+    record(results, scale, "gym.get_all_members", seconds, n)
+
+    terms = FIRST_NAMES[:4]
+    seconds, _ = measure(lambda: [db.search_members(t) for t in terms])
+    record(results, scale, "gym.search_members", seconds, len(terms))
+
+    seconds, _ = measure(db.get_membership_aggregates)
+    record(results, scale, "gym.membership_aggregates", seconds, 1)
+
+    rows = db.get_all_members()
+    seconds, _ = measure(lambda: find_duplicates(rows), repeat=1)
+    record(results, scale, "gym.find_duplicates", seconds, n)
+
+    # A week for up to 10k members across 200 trainers
+    trainers = [(i + 1, t.name, t.specialization)
+                for i, t in enumerate(generate_trainers(200, seed))]
+    rng = random.Random(seed)
+    requests = [(r[0], rng.choice(SPECIALIZATIONS)) for r in rows[:10_000]]
+    slots = week_slots(datetime(2026, 1, 5))
+    seconds, _ = measure(lambda: TrainerScheduler(trainers).auto_assign(requests, slots))
+    record(results, scale, "gym.schedule_week", seconds, len(requests))
+
+    db.close()
+
+
+def bench_students(results, scale, n, seed, workdir):
+    # Every StudentStore call is its own round trip and commit, so all
+    # cases run on a sample
+    store = LocalStudentStore(os.path.join(workdir, f"students_{scale}.db"))
+    students = list(generate_students(min(n, INSERT_SAMPLE), seed))
+
+    start = time.perf_counter()
+    ids = [store.add(*s) for s in students]
+    record(results, scale, "students.add", time.perf_counter() - start, len(ids))
+
+    seconds, _ = measure(store.get_all)
+    record(results, scale, "students.get_all", seconds, len(ids))
+
+    start = time.perf_counter()
+    for student_id, s in zip(ids, students):
+        store.update(student_id, s.name, s.age + 1, s.grade)
+    record(results, scale, "students.update", time.perf_counter() - start, len(ids))
+
+    start = time.perf_counter()
+    for student_id in ids:
+        store.delete(student_id)
+    record(results, scale, "students.delete", time.perf_counter() - start, len(ids))
+
+    store.conn.close()
+
+
+def run(scales, seed=DEFAULT_SEED, workdir=None):
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for scale in scales:
+            n = SCALES[scale]
+            bench_finance(results, scale, n, seed, tmp)
+            bench_gym(results, scale, n, seed, tmp)
+            bench_students(results, scale, n, seed, tmp)
+    return {
+        "meta": {
+            "seed": seed,
+            "scales": list(scales),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Return (case, baseline seconds, current seconds) for each regression."""
+    regressions = []
+    for case, current in report["results"].items():
+        previous = baseline.get("results", {}).get(case)
+        if not previous:
+            continue
+        if current["seconds"] > previous["seconds"] * (1 + tolerance):
+            regressions.append((case, previous["seconds"], current["seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite")
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES),
+                        help="data set size; may be repeated (default: 1k)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown relative to the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.scale or ["1k"], seed=args.seed)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for case, result in report["results"].items():
+        print(f"{case:<40}{result['seconds'] * 1000:>12.2f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for case, before, after in regressions:
+            print(f"REGRESSION {case}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""ODBC connection management for the student and gym apps.
+
+Settings come from an INI file (db.ini, or the file named by SCD_DB_CONFIG)
+with one section per app, and can be overridden per setting with
+environment variables named <SECTION>_DB_<SETTING>, e.g. GYM_DB_SERVERS.
+
+    [gym]
+    servers = DESKTOP-M1HTQTV, BACKUP-SQL
+    database = GymDB
+    login_timeout = 5
+
+ConnectionManager tries the servers in order, each behind its own circuit
+breaker: after failure_threshold consecutive failures a server is skipped
+for reset_timeout seconds, and when every server is skipped connect()
+raises straight away instead of waiting for the driver to time out.
+"""
+import configparser
+import os
+import threading
+import time
+
+CONFIG_ENV = "SCD_DB_CONFIG"
+DEFAULT_CONFIG = "db.ini"
+
+
+class ConnectionUnavailable(Exception):
+    pass
+
+
+class ConnectionSettings:
+    """Connection options; every attribute can be set from file or env."""
+
+    DEFAULTS = {
+        "servers": ["localhost"],
+        "database": "master",
+        "driver": "ODBC Driver 17 for SQL Server",
+        "trusted_connection": True,
+        "username": "",
+        "password": "",
+        "login_timeout": 5,
+        "query_timeout": 30,
+        "failure_threshold": 3,
+        "reset_timeout": 30.0,
+        "max_retries": 2,
+        "backoff_base": 0.5,
+        "backoff_max": 8.0,
+    }
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(self.DEFAULTS)
+        if unknown:
+            raise TypeError(f"Unknown connection settings: {', '.join(sorted(unknown))}")
+        for name, default in self.DEFAULTS.items():
+            value = overrides.get(name, default)
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+
+    def copy(self):
+        return ConnectionSettings(**{name: getattr(self, name) for name in self.DEFAULTS})
+
+    def connection_string(self, server, database=None):
+        parts = [
+            f"DRIVER={{{self.driver}}}",
+            f"SERVER={server}",
+            f"DATABASE={database or self.database}",
+        ]
+        if self.trusted_connection:
+            parts.append("Trusted_Connection=yes")
+        else:
+            parts.append(f"UID={self.username}")
+            parts.append(f"PWD={self.password}")
+        return ";".join(parts) + ";"
+
+
+def _convert(value, default):
+    if isinstance(default, bool):
+        return str(value).strip().lower() in ("1", "yes", "true", "on")
+    if isinstance(default, list):
+        return [s.strip() for s in str(value).split(",") if s.strip()]
+    return type(default)(value)
+
+
+def load_settings(section, defaults=None, path=None, environ=None):
+    """Build ConnectionSettings for one app section.
+
+    Precedence, lowest first: defaults, the INI file, environment variables.
+    """
+    environ = os.environ if environ is None else environ
+    settings = defaults.copy() if defaults else ConnectionSettings()
+    path = path or environ.get(CONFIG_ENV, DEFAULT_CONFIG)
+
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    values = dict(parser[section]) if parser.has_section(section) else {}
+    prefix = f"{section.upper()}_DB_"
+    for name in ConnectionSettings.DEFAULTS:
+        env_name = prefix + name.upper()
+        if env_name in environ:
+            values[name] = environ[env_name]
+
+    for name in ConnectionSettings.DEFAULTS:
+        if name in values:
+            setattr(settings, name, _convert(values[name], getattr(settings, name)))
+    return settings
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open after a cool-down.
+
+    Shared by every worker thread using the manager, so state changes are
+    made under a lock.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            # A failed trial call in half-open state re-opens straight away
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = self.clock()
+
+
+class ConnectionManager:
+    def __init__(self, settings, connect=None, sleep=time.sleep, clock=time.monotonic):
+        """connect defaults to pyodbc.connect; tests pass a fake driver."""
+        if connect is None:
+            import pyodbc
+            connect = pyodbc.connect
+        self.settings = settings
+        self._connect = connect
+        self._sleep = sleep
+        self.breakers = {
+            server: CircuitBreaker(settings.failure_threshold, settings.reset_timeout, clock)
+            for server in settings.servers
+        }
+        self.preferred = None
+        self._lock = threading.Lock()
+
+    def _ordered_servers(self):
+        servers = list(self.settings.servers)
+        with self._lock:
+            preferred = self.preferred
+        if preferred in servers:
+            servers.remove(preferred)
+            servers.insert(0, preferred)
+        return servers
+
+    def connect(self, database=None, **kwargs):
+        """Open a connection to the first healthy server.
+
+        Extra keyword arguments (e.g. autocommit) go to the driver. Raises
+        ConnectionUnavailable when every server failed or is circuit-broken.
+        """
+        errors = []
+        for attempt in range(self.settings.max_retries + 1):
+            tried = False
+            for server in self._ordered_servers():
+                breaker = self.breakers[server]
+                if not breaker.allow():
+                    continue
+                tried = True
+                try:
+                    conn = self._connect(
+                        self.settings.connection_string(server, database),
+                        timeout=self.settings.login_timeout,
+                        **kwargs
+                    )
+                except Exception as e:
+                    breaker.record_failure()
+                    errors.append(f"{server}: {e}")
+                    continue
+                breaker.record_success()
+                with self._lock:
+                    self.preferred = server
+                conn.timeout = self.settings.query_timeout
+                return conn
+
+            if not tried:
+                raise ConnectionUnavailable(
+                    "All database servers are unavailable; retrying after "
+                    f"{self.settings.reset_timeout:g}s cool-down"
+                    + (f"\nLast errors: {'; '.join(errors[-3:])}" if errors else "")
+                )
+            if attempt < self.settings.max_retries:
+                self._sleep(min(self.settings.backoff_max,
+                                self.settings.backoff_base * (2 ** attempt)))
+
+        raise ConnectionUnavailable("Could not connect to any database server:\n" + "\n".join(errors[-3:]))
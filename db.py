@@ -1,54 +1,327 @@
+import calendar
+import os
+import queue
+import random
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date
+
+BUSY_TIMEOUT = 5.0
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05
+
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def with_retry(func, retries=BUSY_RETRIES, backoff=BUSY_BACKOFF):
+    """Call func, retrying with jittered exponential backoff while the db is busy."""
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+def _date_conditions(start, end):
+    conditions, params = [], []
+    if start:
+        conditions.append("date >= ?")
+        params.append(start)
+    if end:
+        conditions.append("date <= ?")
+        params.append(end)
+    return conditions, params
+
+
+def _where(conditions):
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def _month_end(period):
+    year, month = int(period[:4]), int(period[5:7])
+    return f"{period}-{calendar.monthrange(year, month)[1]:02d}"
+
+
+def _next_period(period, step):
+    year, month = int(period[:4]), int(period[5:7]) + step
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return f"{year:04d}-{month:02d}"
+
+
+def _split_periods(start, end):
+    """Split a date range into whole months and partially covered months.
+
+    Returns (first whole month, last whole month, partial months); either
+    bound of the whole-month span is None when the range is open there.
+    """
+    first = last = None
+    partial = []
+    if start:
+        first = start[:7] if start.endswith("-01") else _next_period(start[:7], 1)
+        if not start.endswith("-01"):
+            partial.append(start[:7])
+    if end:
+        last = end[:7] if end == _month_end(end[:7]) else _next_period(end[:7], -1)
+        if end != _month_end(end[:7]) and end[:7] not in partial:
+            partial.append(end[:7])
+    return first, last, partial
+
+
+def _insert_transactions(cursor, rows):
+    cursor.executemany(
+        "INSERT INTO transactions (type, category, amount, date) VALUES (?, ?, ?, ?)",
+        rows
+    )
+
+
+def _upsert_budget(cursor, category, limit_amount):
+    cursor.execute("""
+    INSERT INTO budgets (category, limit_amount)
+    VALUES (?, ?)
+    ON CONFLICT(category)
+    DO UPDATE SET limit_amount = excluded.limit_amount
+    """, (category, limit_amount))
+
+
+def _insert_recurring_rule(cursor, row):
+    cursor.execute(
+        "INSERT INTO recurring_rules (type, category, amount, start, rrule) VALUES (?, ?, ?, ?, ?)",
+        row
+    )
+    return cursor.lastrowid
+
+
+def _delete_recurring_rule(cursor, rule_id):
+    cursor.execute("DELETE FROM recurring_rules WHERE id=?", (rule_id,))
+
+
+class WriterQueue:
+    """Single writer thread for one database file.
+
+    Writes submitted from any thread are applied in order on one connection.
+    Jobs waiting in the queue are grouped into one BEGIN IMMEDIATE
+    transaction, each inside its own savepoint so a failing job only rolls
+    back itself.
+    """
+
+    def __init__(self, db_name, max_batch=500, timeout=BUSY_TIMEOUT):
+        if db_name == ":memory:":
+            raise ValueError("WriterQueue needs a database file; ':memory:' is private to one connection")
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args):
+        """Queue func(cursor, *args) and return a Future for its result."""
+        future = Future()
+        self._jobs.put((func, args, future))
+        return future
+
+    def close(self):
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self):
+        conn = _connect(self.db_name, self.timeout, check_same_thread=True)
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                batch = [job]
+                while len(batch) < self.max_batch:
+                    try:
+                        job = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        self._jobs.put(None)
+                        break
+                    batch.append(job)
+                self._apply(conn, batch)
+        finally:
+            conn.close()
+
+    def _apply(self, conn, batch):
+        results = []
+        try:
+            with_retry(lambda: conn.execute("BEGIN IMMEDIATE"))
+            cursor = conn.cursor()
+            for func, args, future in batch:
+                cursor.execute("SAVEPOINT job")
+                try:
+                    results.append((future, func(cursor, *args), None))
+                    cursor.execute("RELEASE job")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO job")
+                    cursor.execute("RELEASE job")
+                    results.append((future, None, e))
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+def _connect(db_name, timeout, check_same_thread, wal=True):
+    conn = sqlite3.connect(db_name, timeout=timeout, check_same_thread=check_same_thread)
+    conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+    if wal and db_name != ":memory:":
+        with_retry(lambda: conn.execute("PRAGMA journal_mode=WAL"))
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
 
 class DatabaseHandler:
-    def __init__(self, db_name="finance.db"):
-        self.conn = sqlite3.connect(db_name)
+    def __init__(self, db_name="finance.db", check_same_thread=True,
+                 timeout=BUSY_TIMEOUT, wal=True, writer=None):
+        """Open db_name.
+
+        timeout is the busy timeout in seconds. wal switches file databases
+        to write-ahead logging so readers never block the writer. Passing a
+        WriterQueue routes every write through that queue's single thread.
+        """
+        self.conn = _connect(db_name, timeout, check_same_thread, wal)
+        self.db_name = db_name
+        self.writer = writer
         self.create_tables()
 
     def create_tables(self):
-        cursor = self.conn.cursor()
+        def create(cursor):
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                date TEXT NOT NULL
+            )
+            """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            type TEXT NOT NULL,
-            category TEXT NOT NULL,
-            amount REAL NOT NULL,
-            date TEXT NOT NULL
-        )
-        """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transactions_date
+            ON transactions (date)
+            """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS budgets (
-            category TEXT PRIMARY KEY,
-            limit_amount REAL NOT NULL
-        )
-        """)
-        self.conn.commit()
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS budgets (
+                category TEXT PRIMARY KEY,
+                limit_amount REAL NOT NULL
+            )
+            """)
+
+            # Rules only; occurrences are generated when a range is queried
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS recurring_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                start TEXT NOT NULL,
+                rrule TEXT NOT NULL
+            )
+            """)
+
+            # One archive database file per year, plus per-month totals so
+            # sums over archived history never have to open those files.
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archives (
+                year TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                first_date TEXT NOT NULL,
+                last_date TEXT NOT NULL
+            )
+            """)
+
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive_summaries (
+                period TEXT NOT NULL,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                total REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (period, type, category)
+            )
+            """)
+
+        with_retry(lambda: self._transaction(create))
+
+    # ---------- Writes ----------
+    @contextmanager
+    def write_batch(self):
+        """Group statements into one BEGIN IMMEDIATE transaction.
+
+        The write lock is taken up front (with retries), so the batch
+        cannot fail half way with "database is locked".
+        """
+        with_retry(lambda: self.conn.execute("BEGIN IMMEDIATE"))
+        try:
+            yield self.conn.cursor()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+
+    def _transaction(self, func, *args):
+        with self.write_batch() as cursor:
+            return func(cursor, *args)
+
+    def _write(self, func, *args):
+        if self.writer is not None:
+            return self.writer.submit(func, *args).result()
+        return with_retry(lambda: self._transaction(func, *args))
 
     def add_transaction(self, t_type, category, amount, date):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO transactions (type, category, amount, date) VALUES (?, ?, ?, ?)",
-            (t_type, category, amount, date)
-        )
-        self.conn.commit()
+        self._write(_insert_transactions, [(t_type, category, amount, date)])
+
+    def add_transactions(self, rows):
+        """Insert (type, category, amount, date) rows with a single commit."""
+        self._write(_insert_transactions, list(rows))
 
-    def fetch_transactions(self):
+    def fetch_transactions(self, start=None, end=None, after_id=None):
+        """Return transactions in id order, optionally limited to dates in
+        [start, end] and to ids above after_id.
+
+        Archived years are only opened when the range reaches into them.
+        """
+        conditions, params = _date_conditions(start, end)
+        if after_id is not None:
+            conditions.append("id > ?")
+            params.append(after_id)
         cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM transactions")
-        return cursor.fetchall()
+        cursor.execute("SELECT * FROM transactions" + _where(conditions) + " ORDER BY id", params)
+        rows = cursor.fetchall()
+
+        archives = self._archives_for(start, end)
+        for _, path in archives:
+            with self._attached(path):
+                cursor.execute("SELECT * FROM archive.transactions" + _where(conditions), params)
+                rows.extend(cursor.fetchall())
+        if archives:
+            rows.sort(key=lambda row: row[0])
+        return rows
 
     def set_budget(self, category, limit_amount):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        INSERT INTO budgets (category, limit_amount)
-        VALUES (?, ?)
-        ON CONFLICT(category)
-        DO UPDATE SET limit_amount = excluded.limit_amount
-        """, (category, limit_amount))
-        self.conn.commit()
+        self._write(_upsert_budget, category, limit_amount)
 
     def get_budget(self, category):
         cursor = self.conn.cursor()
@@ -58,24 +331,164 @@ class DatabaseHandler:
         )
         return cursor.fetchone()
 
+    def add_recurring_rule(self, t_type, category, amount, start, rrule):
+        """Store a recurring rule and return its id."""
+        return self._write(_insert_recurring_rule, (t_type, category, amount, start, rrule))
+
+    def delete_recurring_rule(self, rule_id):
+        self._write(_delete_recurring_rule, rule_id)
+
+    def get_recurring_rules(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, type, category, amount, start, rrule FROM recurring_rules ORDER BY id")
+        return cursor.fetchall()
+
     # ---------- CORRECT CALCULATIONS ----------
-    def get_total_by_type(self, t_type):
+    def get_total_by_type(self, t_type, start=None, end=None):
+        return self._sum(["type=?"], [t_type], start, end)
+
+    def get_category_expense(self, category, start=None, end=None):
+        return self._sum(["type='Expense'", "category=?"], [category], start, end)
+
+    def _sum(self, conditions, params, start, end):
+        range_conditions, range_params = _date_conditions(start, end)
         cursor = self.conn.cursor()
         cursor.execute(
-            "SELECT SUM(amount) FROM transactions WHERE type=?",
-            (t_type,)
+            "SELECT SUM(amount) FROM transactions" + _where(conditions + range_conditions),
+            params + range_params
         )
-        result = cursor.fetchone()[0]
+        result = cursor.fetchone()[0] or 0
+        if self._archives_for(start, end):
+            result += self._archived_sum(conditions, params, start, end)
         return result if result else 0
 
-    def get_category_expense(self, category):
+    def _archived_sum(self, conditions, params, start, end):
+        first, last, partial = _split_periods(start, end)
+        period_conditions, period_params = [], []
+        if first:
+            period_conditions.append("period >= ?")
+            period_params.append(first)
+        if last:
+            period_conditions.append("period <= ?")
+            period_params.append(last)
+
         cursor = self.conn.cursor()
         cursor.execute(
-            "SELECT SUM(amount) FROM transactions WHERE type='Expense' AND category=?",
-            (category,)
+            "SELECT SUM(total) FROM archive_summaries" + _where(conditions + period_conditions),
+            params + period_params
         )
-        result = cursor.fetchone()[0]
-        return result if result else 0
+        total = cursor.fetchone()[0] or 0
+
+        # Months cut by the range edges need the archived rows themselves.
+        for period in partial:
+            low = max(start or "", f"{period}-01")
+            high = min(end or "9999", _month_end(period))
+            for _, path in self._archives_for(low, high):
+                with self._attached(path):
+                    cursor.execute(
+                        "SELECT SUM(amount) FROM archive.transactions"
+                        + _where(conditions + ["date >= ?", "date <= ?"]),
+                        params + [low, high]
+                    )
+                    total += cursor.fetchone()[0] or 0
+        return total
+
+    # ---------- Archive ----------
+    def archive_before(self, cutoff=None, archive_dir=None):
+        """Move transactions dated before cutoff into yearly archive files.
+
+        cutoff must be the first day of a month and defaults to the start
+        of the current month, so only closed months are archived. Returns
+        the number of rows moved.
+        """
+        if cutoff is None:
+            cutoff = date.today().replace(day=1).isoformat()
+        elif not cutoff.endswith("-01"):
+            raise ValueError("Archive cutoff must be the first day of a month")
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT DISTINCT substr(date, 1, 4) FROM transactions WHERE date < ?",
+            (cutoff,)
+        )
+        years = sorted(row[0] for row in cursor.fetchall())
+
+        moved = 0
+        for year in years:
+            bounds = (f"{year}-01-01", min(cutoff, f"{int(year) + 1:04d}-01-01"))
+            path = self._archive_path(year, archive_dir)
+            with self._attached(path):
+                with self.write_batch() as cursor:
+                    cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS archive.transactions (
+                        id INTEGER PRIMARY KEY,
+                        type TEXT NOT NULL,
+                        category TEXT NOT NULL,
+                        amount REAL NOT NULL,
+                        date TEXT NOT NULL
+                    )
+                    """)
+                    cursor.execute("""
+                    INSERT INTO archive.transactions
+                    SELECT id, type, category, amount, date FROM main.transactions
+                    WHERE date >= ? AND date < ?
+                    """, bounds)
+                    cursor.execute("""
+                    INSERT INTO archive_summaries (period, type, category, total, count)
+                    SELECT substr(date, 1, 7), type, category, SUM(amount), COUNT(*)
+                    FROM main.transactions
+                    WHERE date >= ? AND date < ?
+                    GROUP BY substr(date, 1, 7), type, category
+                    ON CONFLICT(period, type, category)
+                    DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+                    """, bounds)
+                    cursor.execute("""
+                    INSERT INTO archives (year, path, first_date, last_date)
+                    SELECT ?, ?, MIN(date), MAX(date) FROM main.transactions
+                    WHERE date >= ? AND date < ?
+                    ON CONFLICT(year) DO UPDATE SET
+                        first_date = MIN(first_date, excluded.first_date),
+                        last_date = MAX(last_date, excluded.last_date)
+                    """, (year, path) + bounds)
+                    cursor.execute(
+                        "DELETE FROM main.transactions WHERE date >= ? AND date < ?",
+                        bounds
+                    )
+                    moved += cursor.rowcount
+        return moved
+
+    def _archive_path(self, year, archive_dir):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT path FROM archives WHERE year=?", (year,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        if self.db_name == ":memory:":
+            if archive_dir is None:
+                raise ValueError("archive_dir is required for in-memory databases")
+            stem = "finance"
+        else:
+            stem = os.path.splitext(os.path.basename(self.db_name))[0]
+            if archive_dir is None:
+                archive_dir = os.path.dirname(self.db_name)
+        return os.path.join(archive_dir, f"{stem}_archive_{year}.db")
+
+    def _archives_for(self, start, end):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+        SELECT year, path FROM archives
+        WHERE (? IS NULL OR last_date >= ?) AND (? IS NULL OR first_date <= ?)
+        ORDER BY year
+        """, (start, start, end, end))
+        return cursor.fetchall()
+
+    @contextmanager
+    def _attached(self, path):
+        self.conn.execute("ATTACH DATABASE ? AS archive", (path,))
+        try:
+            yield
+        finally:
+            self.conn.execute("DETACH DATABASE archive")
 
     def close(self):
         self.conn.close()
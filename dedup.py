@@ -0,0 +1,215 @@
+"""Duplicate gym member detection.
+
+Members are only compared inside blocks: one block per phone suffix and
+one per phonetic name key. Two members are a candidate match when their
+phone numbers (digits only, last 10) differ in at most one digit; the
+fuzzy name score is computed only for those pairs. Oversized blocks, such
+as a very common name, are scanned with a sliding window over the members
+sorted by phone instead of comparing every pair.
+"""
+from collections import defaultdict, namedtuple
+
+PHONE_DIGITS = 10
+PHONE_BLOCK_DIGITS = 7
+DEFAULT_THRESHOLD = 0.86
+MAX_BLOCK = 64
+WINDOW = 8
+# A one-digit phone difference is probably a typo, but less certain
+TYPO_PENALTY = 0.95
+
+DuplicatePair = namedtuple("DuplicatePair", "first_id second_id score")
+
+_SOUNDEX_CODES = {}
+for _letters, _code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"),
+                        ("l", "4"), ("mn", "5"), ("r", "6")):
+    for _letter in _letters:
+        _SOUNDEX_CODES[_letter] = _code
+
+
+def normalize_phone(phone):
+    """Keep the digits only, as validate_input counts them."""
+    return "".join(c for c in str(phone) if c.isdigit())
+
+
+def normalize_name(name):
+    return " ".join("".join(c for c in name.lower() if c.isalpha() or c.isspace()).split())
+
+
+def soundex(word):
+    if not word:
+        return ""
+    code = word[0].upper()
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for c in word[1:]:
+        digit = _SOUNDEX_CODES.get(c, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def name_key(name):
+    """Phonetic key of the first and last name."""
+    parts = normalize_name(name).split()
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return soundex(parts[0])
+    return soundex(parts[0]) + soundex(parts[-1])
+
+
+def jaro_winkler(a, b):
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    match_range = max(len_a, len_b) // 2 - 1
+    matched_b = [False] * len_b
+    matches_a = []
+    for i, c in enumerate(a):
+        low = max(0, i - match_range)
+        high = min(i + match_range + 1, len_b)
+        for j in range(low, high):
+            if not matched_b[j] and b[j] == c:
+                matched_b[j] = True
+                matches_a.append(c)
+                break
+    m = len(matches_a)
+    if not m:
+        return 0.0
+
+    matches_b = [b[j] for j in range(len_b) if matched_b[j]]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    jaro = (m / len_a + m / len_b + (m - transpositions) / m) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+class _Record:
+    __slots__ = ("member_id", "name", "phone")
+
+    def __init__(self, member_id, name, phone):
+        self.member_id = member_id
+        self.name = normalize_name(name)
+        self.phone = normalize_phone(phone)[-PHONE_DIGITS:]
+
+
+def _phone_distance(a, b):
+    if len(a) != len(b):
+        return PHONE_DIGITS
+    return sum(x != y for x, y in zip(a, b))
+
+
+def _score(a, b):
+    distance = _phone_distance(a.phone, b.phone)
+    if distance > 1:
+        return 0.0
+    similarity = jaro_winkler(a.name, b.name)
+    return similarity if distance == 0 else similarity * TYPO_PENALTY
+
+
+def _block_keys(record):
+    keys = []
+    if len(record.phone) >= PHONE_BLOCK_DIGITS:
+        keys.append("p" + record.phone[-PHONE_BLOCK_DIGITS:])
+    key = name_key(record.name)
+    if key:
+        keys.append("n" + key)
+    return keys
+
+
+def _candidate_pairs(block, window):
+    if len(block) <= MAX_BLOCK:
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                yield a, b
+        return
+    # Sorted neighbourhood: one pass in phone order, one in reversed-phone
+    # order, so a typo in either half of the number still sorts nearby.
+    for key in (lambda r: r.phone, lambda r: r.phone[::-1]):
+        ordered = sorted(block, key=key)
+        for i, a in enumerate(ordered):
+            for b in ordered[i + 1:i + window]:
+                yield a, b
+
+
+def find_duplicates(rows, threshold=DEFAULT_THRESHOLD, window=WINDOW):
+    """Return DuplicatePair tuples for likely duplicates among member rows.
+
+    rows are (id, name, age, phone, ...) tuples as returned by
+    Database.get_all_members.
+    """
+    blocks = defaultdict(list)
+    for row in rows:
+        record = _Record(row[0], row[1], row[3])
+        for key in _block_keys(record):
+            blocks[key].append(record)
+
+    seen = set()
+    pairs = []
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        for a, b in _candidate_pairs(block, window):
+            pair = (a.member_id, b.member_id) if a.member_id < b.member_id else (b.member_id, a.member_id)
+            if pair in seen:
+                continue
+            seen.add(pair)
+            score = _score(a, b)
+            if score >= threshold:
+                pairs.append(DuplicatePair(pair[0], pair[1], score))
+    pairs.sort(key=lambda p: (-p.score, p.first_id, p.second_id))
+    return pairs
+
+
+class DuplicateIndex:
+    """Block index over existing members for checks at insert time."""
+
+    def __init__(self, rows=(), threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.blocks = defaultdict(list)
+        self.records = {}
+        for row in rows:
+            self.add(row[0], row[1], row[3])
+
+    def add(self, member_id, name, phone):
+        record = _Record(member_id, name, phone)
+        self.records[member_id] = record
+        for key in _block_keys(record):
+            self.blocks[key].append(record)
+
+    def remove(self, member_id):
+        record = self.records.pop(member_id, None)
+        if record is None:
+            return
+        for key in _block_keys(record):
+            block = self.blocks[key]
+            block.remove(record)
+            if not block:
+                del self.blocks[key]
+
+    def check(self, name, phone):
+        """Return [(member_id, score)] of existing members that look the same."""
+        probe = _Record(None, name, phone)
+        seen = set()
+        matches = []
+        for key in _block_keys(probe):
+            for record in self.blocks.get(key, ()):
+                if record.member_id in seen:
+                    continue
+                seen.add(record.member_id)
+                score = _score(probe, record)
+                if score >= self.threshold:
+                    matches.append((record.member_id, score))
+        matches.sort(key=lambda m: -m[1])
+        return matches
@@ -1,14 +1,20 @@
 import tkinter as tk
+from datetime import date
 from tkinter import messagebox
+from profiling import tracer
 from db import DatabaseHandler
-from logic import Transaction, BudgetManager, SavingsManager
+from journal import JournalError, OperationJournal
+from logic import Transaction, BudgetManager, RecurringManager, RecurringRule, SavingsManager
 
 
 class FinanceGUI:
-    def __init__(self, root):
-        self.db = DatabaseHandler()
-        self.budget_manager = BudgetManager(self.db)
+    def __init__(self, root, db_name="finance.db"):
+        with tracer.span("db init"):
+            self.db = DatabaseHandler(db_name)
+            self.journal = OperationJournal(self.db)
+        self.budget_manager = BudgetManager(self.db, self.journal)
         self.savings_manager = SavingsManager(self.db)
+        self.recurring_manager = RecurringManager(self.db)
 
         root.title("Personal Finance Manager")
         root.geometry("640x750")
@@ -88,6 +94,19 @@ class FinanceGUI:
             relief="flat", padx=30, pady=10
         ).pack(pady=10)
 
+        history = tk.Frame(root, bg="#0b1c2d")
+        history.pack(pady=5)
+
+        for label, command in (("Undo", self.undo), ("Redo", self.redo),
+                               ("Recurring", self.view_recurring)):
+            tk.Button(
+                history, text=label,
+                command=command,
+                bg="#1f3b64", fg="white",
+                font=("Segoe UI", 11, "bold"),
+                relief="flat", padx=20, pady=6
+            ).pack(side="left", padx=8)
+
     # ---------- UI Helpers ----------
     def label(self, parent, text, color):
         tk.Label(parent, text=text, bg=parent["bg"], fg=color).pack()
@@ -118,7 +137,7 @@ class FinanceGUI:
                 amount
             )
 
-            self.db.add_transaction(
+            self.journal.add_transaction(
                 transaction.t_type,
                 transaction.category,
                 transaction.amount,
@@ -159,15 +178,40 @@ class FinanceGUI:
                 "Failed to save budget"
             )
 
+    def undo(self):
+        try:
+            label = self.journal.undo()
+            if label is None:
+                messagebox.showinfo("Undo", "Nothing to undo")
+            else:
+                messagebox.showinfo("Undo", f"Undone: {label}")
+        except JournalError as e:
+            messagebox.showerror("Undo", str(e))
+        except Exception:
+            messagebox.showerror("System Error", "Undo failed")
+
+    def redo(self):
+        try:
+            label = self.journal.redo()
+            if label is None:
+                messagebox.showinfo("Redo", "Nothing to redo")
+            else:
+                messagebox.showinfo("Redo", f"Redone: {label}")
+        except Exception:
+            messagebox.showerror("System Error", "Redo failed")
+
     def view_summary(self):
         try:
-            data = self.db.fetch_transactions()
-            if not data:
+            with tracer.once("first query"):
+                data = self.db.fetch_transactions()
+            recurring = self.recurring_manager.transactions(None, date.today())
+            if not data and not recurring:
                 messagebox.showinfo("Summary", "No records found")
                 return
 
             summary = "\n".join(
-                f"{row[1]} | {row[2]} | {row[3]}" for row in data
+                [f"{row[1]} | {row[2]} | {row[3]}" for row in data]
+                + [f"{row[0]} | {row[1]} | {row[2]} | recurring {row[3]}" for row in recurring]
             )
 
             messagebox.showinfo("Transaction Summary", summary)
@@ -178,13 +222,75 @@ class FinanceGUI:
                 "Unable to fetch transaction summary"
             )
 
+    def view_recurring(self):
+        """List recurring rules; add one from the form's type, category and amount."""
+        win = tk.Toplevel()
+        win.title("Recurring Transactions")
+        win.geometry("460x360")
+
+        listbox = tk.Listbox(win, font=("Courier", 10))
+        listbox.pack(fill="both", expand=True, padx=8, pady=8)
+        rules = []
+
+        def refresh():
+            rules[:] = self.recurring_manager.rules()
+            listbox.delete(0, tk.END)
+            for rule in rules:
+                listbox.insert(tk.END, f"{rule.t_type} | {rule.category} | {rule.amount} | "
+                                       f"from {rule.start} | {rule.to_rrule()}")
+
+        form = tk.Frame(win)
+        form.pack(pady=4)
+        start_var = tk.StringVar(value=date.today().isoformat())
+        repeat_var = tk.StringVar(value="FREQ=MONTHLY")
+        tk.Label(form, text="Start").grid(row=0, column=0)
+        tk.Entry(form, textvariable=start_var, width=12).grid(row=0, column=1, padx=4)
+        tk.Label(form, text="Repeat").grid(row=0, column=2)
+        tk.OptionMenu(form, repeat_var, "FREQ=MONTHLY", "FREQ=WEEKLY",
+                      "FREQ=WEEKLY;INTERVAL=2", "FREQ=YEARLY", "FREQ=DAILY").grid(row=0, column=3)
+
+        def add():
+            try:
+                if not self.amount_var.get():
+                    raise ValueError("Amount field is required")
+                rule = RecurringRule.from_rrule(
+                    self.type_var.get(), self.category_var.get(),
+                    float(self.amount_var.get()), start_var.get(), repeat_var.get()
+                )
+                self.recurring_manager.add_rule(rule)
+                self.clear_inputs()
+                refresh()
+            except ValueError as ve:
+                messagebox.showerror("Input Error", str(ve), parent=win)
+            except Exception:
+                messagebox.showerror("System Error", "Failed to save recurring rule", parent=win)
+
+        def delete():
+            selected = listbox.curselection()
+            if not selected:
+                return
+            try:
+                self.recurring_manager.remove_rule(rules[selected[0]].rule_id)
+                refresh()
+            except Exception:
+                messagebox.showerror("System Error", "Failed to delete recurring rule", parent=win)
+
+        buttons = tk.Frame(win)
+        buttons.pack(pady=6)
+        tk.Button(buttons, text="Add Rule", command=add).pack(side="left", padx=6)
+        tk.Button(buttons, text="Delete Selected", command=delete).pack(side="left", padx=6)
+        tk.Button(buttons, text="Close", command=win.destroy).pack(side="left", padx=6)
+        refresh()
+
     def view_savings(self):
         try:
-            savings = self.savings_manager.calculate_savings()
-            messagebox.showinfo(
-                "Savings",
-                f"Total Savings: {savings:.2f}"
-            )
+            with tracer.once("first query"):
+                savings = self.savings_manager.calculate_savings()
+            message = f"Total Savings: {savings:.2f}"
+            projection = self.savings_manager.project(12)
+            if any(income or expense for _, income, expense, _ in projection):
+                message += f"\nProjected by {projection[-1][0]}: {projection[-1][3]:.2f}"
+            messagebox.showinfo("Savings", message)
         except Exception:
             messagebox.showerror(
                 "System Error",
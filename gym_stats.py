@@ -0,0 +1,66 @@
+"""Membership statistics for the gym dashboard.
+
+The database computes the aggregates once with GROUP BY queries; after
+that MembershipStats is kept current by applying each added or deleted
+member as a delta, so showing the dashboard never touches member rows.
+"""
+from collections import Counter
+
+# (label, lowest age, highest age); validate_input allows ages 10-100
+AGE_BANDS = [
+    ("10-17", 10, 17),
+    ("18-25", 18, 25),
+    ("26-35", 26, 35),
+    ("36-50", 36, 50),
+    ("51+", 51, 200),
+]
+
+
+def age_band(age):
+    for label, low, high in AGE_BANDS:
+        if low <= age <= high:
+            return label
+    return "Other"
+
+
+def age_band_sql(column="age"):
+    """SQL CASE expression mapping column to the AGE_BANDS labels."""
+    cases = " ".join(
+        f"WHEN {column} BETWEEN {low} AND {high} THEN '{label}'"
+        for label, low, high in AGE_BANDS
+    )
+    return f"CASE {cases} ELSE 'Other' END"
+
+
+class MembershipStats:
+    def __init__(self, fees, by_type=None, by_month=None, by_age_band=None):
+        self.fees = fees
+        self.by_type = Counter(by_type or {})
+        self.by_month = Counter(by_month or {})
+        self.by_age_band = Counter(by_age_band or {})
+
+    @classmethod
+    def from_aggregates(cls, fees, aggregates):
+        """Build from the dict returned by Database.get_membership_aggregates."""
+        return cls(fees, aggregates["by_type"], aggregates["by_month"],
+                   aggregates["by_age_band"])
+
+    def apply(self, age, membership_type, join_date, delta=1):
+        """Count a member in (delta=1) or out (delta=-1)."""
+        for counter, key in ((self.by_type, membership_type),
+                             (self.by_month, join_date[:7]),
+                             (self.by_age_band, age_band(age))):
+            counter[key] += delta
+            if counter[key] <= 0:
+                del counter[key]
+
+    @property
+    def total(self):
+        return sum(self.by_type.values())
+
+    @property
+    def monthly_revenue(self):
+        return sum(self.fees.get(t, 0) * n for t, n in self.by_type.items())
+
+    def revenue_by_type(self):
+        return {t: self.fees.get(t, 0) * n for t, n in self.by_type.items()}
@@ -0,0 +1,56 @@
+"""Gym work that combines several database calls with CPU-bound steps.
+
+Each task takes an AsyncDataAccess and runs its heavy part with
+asyncio.to_thread, so the Tk thread only awaits results. Nothing here
+imports Tk or pyodbc; tests drive the tasks against standin.LocalGymDatabase.
+"""
+import asyncio
+from datetime import timedelta
+
+from dedup import DuplicateIndex, find_duplicates
+from scheduler import TrainerScheduler, week_slots
+
+
+class NoTrainers(Exception):
+    pass
+
+
+async def build_duplicate_index(data):
+    rows = await data.call("get_all_members")
+    return await asyncio.to_thread(DuplicateIndex, rows)
+
+
+async def duplicate_report(data):
+    """Likely duplicate members as (id, name, id 2, name 2, score) rows."""
+    rows = await data.call("get_all_members")
+    pairs = await asyncio.to_thread(find_duplicates, rows)
+    names = {r[0]: r[1] for r in rows}
+    return [(p.first_id, names[p.first_id], p.second_id, names[p.second_id],
+             f"{p.score:.2f}") for p in pairs]
+
+
+async def plan_week(data, week_start):
+    """Book one session for every member without one in the week.
+
+    Returns (sessions booked, members that could not be placed).
+    """
+    week_end = week_start + timedelta(days=7)
+    trainers, members, existing = await asyncio.gather(
+        data.call("get_all_trainers"),
+        data.call("get_all_members"),
+        data.call("get_sessions", week_start, week_end),
+    )
+    if not trainers:
+        raise NoTrainers("Add a trainer before scheduling")
+
+    def plan():
+        scheduler = TrainerScheduler(trainers, existing)
+        booked = {s[1] for s in existing}
+        # One session per member who has none this week, any specialization
+        requests = [(m[0], None) for m in members if m[0] not in booked]
+        return scheduler.auto_assign(requests, week_slots(week_start))
+
+    sessions, unplaced = await asyncio.to_thread(plan)
+    # The database skips sessions another scheduler booked in the meantime
+    saved = await data.call("add_sessions", sessions) if sessions else []
+    return len(saved), len(unplaced) + len(sessions) - len(saved)
@@ -0,0 +1,245 @@
+"""Undo/redo journal for finance operations.
+
+Operations are grouped into batches. A batch is applied in one write
+transaction and can be undone or redone as a unit. The journal keeps only
+inverse records: the id range of inserted transactions (rows of one batch
+get consecutive ids because the batch holds the write lock) and the
+previous limit of each budget it changed. Undoing a batch parks its rows
+in journal_undone_rows so redo can put them back with their original ids.
+
+A batch whose rows archive_before has since moved out of the transactions
+table can no longer be undone; undo raises JournalError instead. Snapshot
+files are not told about undo or redo: append_snapshot only picks up new
+ids, so re-export a snapshot after undoing rows it already holds.
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+from logic import Transaction
+
+
+class JournalError(Exception):
+    pass
+
+
+class Batch:
+    """Operations collected for one journal batch."""
+
+    def __init__(self, label):
+        self.label = label
+        self.ops = []
+
+    def add_transaction(self, t_type, category, amount, date):
+        self.ops.append(("insert", [(t_type, category, amount, date)]))
+
+    def add_transactions(self, rows):
+        self.ops.append(("insert", list(rows)))
+
+    def set_budget(self, category, limit_amount):
+        self.ops.append(("budget", (category, limit_amount)))
+
+
+class OperationJournal:
+    def __init__(self, db):
+        self.db = db
+        self.create_tables()
+
+    def create_tables(self):
+        with self.db.write_batch() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS journal_batches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT NOT NULL,
+                created TEXT NOT NULL,
+                undone INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS journal_ops (
+                batch_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (batch_id, seq)
+            )
+            """)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS journal_undone_rows (
+                batch_id INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                date TEXT NOT NULL
+            )
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_journal_undone_rows
+            ON journal_undone_rows (batch_id)
+            """)
+
+    # ---------- Recording ----------
+    def commit(self, batch):
+        """Apply a Batch in one transaction and journal it; returns its id."""
+        if not batch.ops:
+            return None
+        with self.db.write_batch() as cursor:
+            self._discard_redo(cursor)
+            cursor.execute(
+                "INSERT INTO journal_batches (label, created) VALUES (?, ?)",
+                (batch.label, datetime.now().isoformat(timespec="seconds"))
+            )
+            batch_id = cursor.lastrowid
+
+            records = []
+            for op, data in batch.ops:
+                if op == "insert":
+                    first = self._last_id(cursor) + 1
+                    cursor.executemany(
+                        "INSERT INTO transactions (type, category, amount, date) VALUES (?, ?, ?, ?)",
+                        data
+                    )
+                    last = self._last_id(cursor)
+                    if records and records[-1][0] == "insert" and records[-1][1][1] == first - 1:
+                        records[-1] = ("insert", (records[-1][1][0], last))
+                    elif last >= first:
+                        records.append(("insert", (first, last)))
+                else:
+                    category, limit_amount = data
+                    cursor.execute("SELECT limit_amount FROM budgets WHERE category=?", (category,))
+                    previous = cursor.fetchone()
+                    cursor.execute("""
+                    INSERT INTO budgets (category, limit_amount) VALUES (?, ?)
+                    ON CONFLICT(category) DO UPDATE SET limit_amount = excluded.limit_amount
+                    """, (category, limit_amount))
+                    records.append(("budget", (category, previous[0] if previous else None, limit_amount)))
+
+            cursor.executemany(
+                "INSERT INTO journal_ops (batch_id, seq, op, data) VALUES (?, ?, ?, ?)",
+                [(batch_id, seq, op, json.dumps(data)) for seq, (op, data) in enumerate(records)]
+            )
+        return batch_id
+
+    @contextmanager
+    def batch(self, label):
+        """Collect operations in the with block and commit them together."""
+        batch = Batch(label)
+        yield batch
+        self.commit(batch)
+
+    def add_transaction(self, t_type, category, amount, date):
+        batch = Batch(f"Add {t_type} {category} {amount}")
+        batch.add_transaction(t_type, category, amount, date)
+        return self.commit(batch)
+
+    def set_budget(self, category, limit_amount):
+        batch = Batch(f"Budget {category} {limit_amount}")
+        batch.set_budget(category, limit_amount)
+        return self.commit(batch)
+
+    def import_transactions(self, rows, label="Import"):
+        """Validate (type, category, amount, date) rows and add them as one batch."""
+        batch = Batch(label)
+        checked = []
+        for t_type, category, amount, date in rows:
+            Transaction(t_type, category, float(amount))
+            checked.append((t_type, category, float(amount), date))
+        batch.add_transactions(checked)
+        return self.commit(batch)
+
+    # ---------- Undo / redo ----------
+    def undo(self):
+        """Undo the latest batch; returns its label, or None if nothing to undo."""
+        with self.db.write_batch() as cursor:
+            cursor.execute("SELECT id, label FROM journal_batches WHERE undone = 0 ORDER BY id DESC LIMIT 1")
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            batch_id, label = row
+            ops = self._ops(cursor, batch_id)
+            for op, data in ops:
+                if op == "insert":
+                    first, last = data
+                    cursor.execute("SELECT COUNT(*) FROM transactions WHERE id BETWEEN ? AND ?",
+                                   (first, last))
+                    if cursor.fetchone()[0] != last - first + 1:
+                        raise JournalError(f"Cannot undo {label!r}: its transactions have been archived")
+            for op, data in reversed(ops):
+                if op == "insert":
+                    first, last = data
+                    cursor.execute("""
+                    INSERT INTO journal_undone_rows (batch_id, id, type, category, amount, date)
+                    SELECT ?, id, type, category, amount, date FROM transactions
+                    WHERE id BETWEEN ? AND ?
+                    """, (batch_id, first, last))
+                    cursor.execute("DELETE FROM transactions WHERE id BETWEEN ? AND ?", (first, last))
+                else:
+                    self._put_budget(cursor, data[0], data[1])
+            cursor.execute("UPDATE journal_batches SET undone = 1 WHERE id = ?", (batch_id,))
+        return label
+
+    def redo(self):
+        """Reapply the most recently undone batch; returns its label or None."""
+        with self.db.write_batch() as cursor:
+            cursor.execute("SELECT id, label FROM journal_batches WHERE undone = 1 ORDER BY id LIMIT 1")
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            batch_id, label = row
+            for op, data in self._ops(cursor, batch_id):
+                if op == "insert":
+                    cursor.execute("""
+                    INSERT INTO transactions (id, type, category, amount, date)
+                    SELECT id, type, category, amount, date FROM journal_undone_rows
+                    WHERE batch_id = ? AND id BETWEEN ? AND ?
+                    """, (batch_id, data[0], data[1]))
+                else:
+                    self._put_budget(cursor, data[0], data[2])
+            cursor.execute("DELETE FROM journal_undone_rows WHERE batch_id = ?", (batch_id,))
+            cursor.execute("UPDATE journal_batches SET undone = 0 WHERE id = ?", (batch_id,))
+        return label
+
+    def history(self, limit=20):
+        """Latest batches as (id, label, created, undone)."""
+        cursor = self.db.conn.cursor()
+        cursor.execute(
+            "SELECT id, label, created, undone FROM journal_batches ORDER BY id DESC LIMIT ?",
+            (limit,)
+        )
+        return cursor.fetchall()
+
+    # ---------- Helpers ----------
+    @staticmethod
+    def _last_id(cursor):
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transactions'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _ops(cursor, batch_id):
+        cursor.execute("SELECT op, data FROM journal_ops WHERE batch_id = ? ORDER BY seq", (batch_id,))
+        return [(op, json.loads(data)) for op, data in cursor.fetchall()]
+
+    @staticmethod
+    def _put_budget(cursor, category, limit_amount):
+        if limit_amount is None:
+            cursor.execute("DELETE FROM budgets WHERE category = ?", (category,))
+        else:
+            cursor.execute("""
+            INSERT INTO budgets (category, limit_amount) VALUES (?, ?)
+            ON CONFLICT(category) DO UPDATE SET limit_amount = excluded.limit_amount
+            """, (category, limit_amount))
+
+    @staticmethod
+    def _discard_redo(cursor):
+        # A new batch ends the redo chain
+        cursor.execute("""
+        DELETE FROM journal_undone_rows
+        WHERE batch_id IN (SELECT id FROM journal_batches WHERE undone = 1)
+        """)
+        cursor.execute("""
+        DELETE FROM journal_ops
+        WHERE batch_id IN (SELECT id FROM journal_batches WHERE undone = 1)
+        """)
+        cursor.execute("DELETE FROM journal_batches WHERE undone = 1")
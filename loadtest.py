@@ -0,0 +1,118 @@
+"""Load test for the headless finance service.
+
+Usage:
+    python loadtest.py                          # starts a service on a temp db
+    python loadtest.py --port 8765 --clients 64 --requests 20000
+
+Each client keeps one HTTP connection open and sends a mix of transaction
+inserts, savings queries and budget lookups. Prints requests/sec and
+latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from service import FinanceService, start_server
+
+CATEGORIES = ["Food", "Rent", "Transport", "Shopping", "Utilities", "Other"]
+
+
+def build_request(rng):
+    roll = rng.random()
+    if roll < 0.8:
+        body = json.dumps({
+            "type": "Expense" if rng.random() < 0.8 else "Income",
+            "category": rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(10, 5000), 2),
+        })
+        return f"POST /transactions HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}".encode()
+    if roll < 0.9:
+        return b"GET /savings HTTP/1.1\r\n\r\n"
+    return f"GET /budgets/{rng.choice(CATEGORIES)} HTTP/1.1\r\n\r\n".encode()
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def client(host, port, count, seed, latencies, errors):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            writer.write(build_request(rng))
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(host, port, clients, requests, seed=0):
+    latencies, errors = [], []
+    per_client = max(1, requests // clients)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, per_client, seed + i, latencies, errors)
+        for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def main(args):
+    if args.port:
+        return await run(args.host, args.port, args.clients, args.requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = FinanceService(os.path.join(tmp, "loadtest.db"))
+        server = await start_server(service, args.host, 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await run(args.host, port, args.clients, args.requests)
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the finance service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="existing service port; omit to start one")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10_000)
+    result = asyncio.run(main(parser.parse_args()))
+    print(json.dumps(result, indent=2))
@@ -1,12 +1,49 @@
-from datetime import datetime
+import heapq
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# freq -> (unit, size); monthly and yearly rules step in calendar months
+FREQUENCIES = {
+    "DAILY": ("days", 1),
+    "WEEKLY": ("days", 7),
+    "MONTHLY": ("months", 1),
+    "YEARLY": ("months", 12),
+}
+
+
+def _as_date(value):
+    """Accept a date, datetime, "YYYY-MM-DD" or RRULE-style "YYYYMMDD"."""
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    text = str(value)
+    if len(text) >= 8 and text[:8].isdigit():
+        return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+    return date.fromisoformat(text[:10])
+
+
+def _month_start(index):
+    year, month = divmod(index, 12)
+    return date(year, month + 1, 1)
+
+
+@lru_cache(maxsize=32)
+def _month_ordinals(first_month, months):
+    return [_month_start(first_month + i).toordinal() for i in range(months)]
+
+
+def validate_transaction(t_type, amount):
+    if t_type not in ["Income", "Expense"]:
+        raise ValueError("Invalid transaction type")
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
 
 
 class Transaction:
     def __init__(self, t_type, category, amount):
-        if t_type not in ["Income", "Expense"]:
-            raise ValueError("Invalid transaction type")
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
+        validate_transaction(t_type, amount)
 
         self.t_type = t_type
         self.category = category
@@ -14,21 +51,227 @@ class Transaction:
         self.date = datetime.now().strftime("%Y-%m-%d")
 
 
-class BudgetManager:
+class RecurringRule:
+    """A transaction that repeats, e.g. rent every month or pay every other week.
+
+    Occurrences are computed on demand for the range asked for; nothing is
+    stored per occurrence. Monthly and yearly rules fall on month_day
+    (default: start's day, -1 for the last day), clamped to short months.
+    """
+
+    def __init__(self, t_type, category, amount, start, freq="MONTHLY",
+                 interval=1, count=None, until=None, month_day=None, rule_id=None):
+        validate_transaction(t_type, amount)
+        freq = freq.upper()
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unsupported frequency {freq}")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("Interval and count must be positive")
+
+        self.rule_id = rule_id
+        self.t_type = t_type
+        self.category = category
+        self.amount = amount
+        self.start = _as_date(start)
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = _as_date(until)
+
+        unit, size = FREQUENCIES[freq]
+        self.monthly = unit == "months"
+        self.step = size * interval
+        if month_day is None:
+            month_day = self.start.day
+        if not (month_day == -1 or 1 <= month_day <= 31):
+            raise ValueError("Month day must be 1-31 or -1")
+        self.month_day = month_day
+        self.origin = self.start.year * 12 + self.start.month - 1
+        if self.monthly and self._on(0) < self.start:
+            self.origin += self.step
+
+        # Index of the final occurrence, None while the rule is open ended
+        self.last = None
+        if count is not None:
+            self.last = count - 1
+        if self.until is not None:
+            k = self._last_index(self.until)
+            self.last = k if self.last is None else min(self.last, k)
+
+    @classmethod
+    def from_rrule(cls, t_type, category, amount, start, rrule, rule_id=None):
+        """Build a rule from an RRULE subset: FREQ, INTERVAL, COUNT, UNTIL, BYMONTHDAY."""
+        parts = {}
+        for part in rrule.upper().removeprefix("RRULE:").split(";"):
+            if part:
+                key, _, value = part.partition("=")
+                parts[key.strip()] = value.strip()
+        unknown = set(parts) - {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYMONTHDAY"}
+        if unknown:
+            raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(unknown))}")
+        return cls(
+            t_type, category, amount, start,
+            freq=parts.get("FREQ", "MONTHLY"),
+            interval=int(parts.get("INTERVAL", 1)),
+            count=int(parts["COUNT"]) if "COUNT" in parts else None,
+            until=parts.get("UNTIL"),
+            month_day=int(parts["BYMONTHDAY"]) if "BYMONTHDAY" in parts else None,
+            rule_id=rule_id,
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a rule from a recurring_rules row."""
+        rule_id, t_type, category, amount, start, rrule = row
+        return cls.from_rrule(t_type, category, amount, start, rrule, rule_id)
+
+    def to_rrule(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until:%Y%m%d}")
+        if self.monthly and self.month_day != self.start.day:
+            parts.append(f"BYMONTHDAY={self.month_day}")
+        return ";".join(parts)
+
+    # ---------- Occurrence arithmetic ----------
+    def _on(self, k):
+        """Date of occurrence number k."""
+        if not self.monthly:
+            return self.start + timedelta(days=k * self.step)
+        year, month = divmod(self.origin + k * self.step, 12)
+        days = monthrange(year, month + 1)[1]
+        return date(year, month + 1, days if self.month_day == -1 else min(self.month_day, days))
+
+    def _first_index(self, day):
+        """Smallest k with occurrence k on or after day."""
+        if day <= self.start:
+            return 0
+        if not self.monthly:
+            return -(-(day - self.start).days // self.step)
+        k = max(0, -(-(day.year * 12 + day.month - 1 - self.origin) // self.step))
+        return k + 1 if self._on(k) < day else k
+
+    def _last_index(self, day):
+        """Largest k with occurrence k on or before day (negative if none)."""
+        if not self.monthly:
+            return (day - self.start).days // self.step
+        k = (day.year * 12 + day.month - 1 - self.origin) // self.step
+        return k - 1 if k >= 0 and self._on(k) > day else k
+
+    def _index_range(self, start, end):
+        first = 0 if start is None else self._first_index(_as_date(start))
+        last = self.last
+        if end is not None:
+            k = self._last_index(_as_date(end))
+            last = k if last is None else min(last, k)
+        return first, last
+
+    def occurrences(self, start=None, end=None):
+        """Yield occurrence dates in [start, end], lazily and in order."""
+        k, last = self._index_range(start, end)
+        while last is None or k <= last:
+            yield self._on(k)
+            k += 1
+
+    def count_between(self, start, end):
+        """Number of occurrences in [start, end]; start None means from the first."""
+        if end is None and self.last is None:
+            raise ValueError("An open-ended rule needs an end date to count")
+        first, last = self._index_range(start, end)
+        return max(0, last - first + 1)
+
+    def monthly_counts(self, start, months):
+        """Occurrences per month for months calendar months from start.
+
+        The first bucket runs from start to the end of its month.
+        """
+        start = _as_date(start)
+        first_month = start.year * 12 + start.month - 1
+        end = _month_start(first_month + months) - timedelta(days=1)
+        counts = [0] * months
+        first, last = self._index_range(start, end)
+        if last < first:
+            return counts
+        if self.monthly:
+            # Occurrence k is the only one in month origin + k * step
+            n = last - first + 1
+            pos = self.origin + first * self.step - first_month
+            counts[pos:pos + n * self.step:self.step] = [1] * n
+            return counts
+        # Daily/weekly: difference of occurrence indexes at month boundaries
+        origin = self.start.toordinal()
+        bounds = [first]
+        for day in _month_ordinals(first_month + 1, months):
+            bounds.append(min(max(0, -(-(day - origin) // self.step)), last + 1))
+        return [b - a for a, b in zip(bounds, bounds[1:])]
+
+    def transactions(self, start, end):
+        """Yield (type, category, amount, date) rows for occurrences in [start, end]."""
+        for day in self.occurrences(start, end):
+            yield self.t_type, self.category, self.amount, day.strftime("%Y-%m-%d")
+
+
+def recurring_transactions(rules, start, end):
+    """Materialize rules for [start, end] as rows merged in date order."""
+    return heapq.merge(*(rule.transactions(start, end) for rule in rules),
+                       key=lambda row: row[3])
+
+
+class RecurringManager:
     def __init__(self, db):
         self.db = db
 
+    def add_rule(self, rule):
+        rule.rule_id = self.db.add_recurring_rule(
+            rule.t_type, rule.category, rule.amount,
+            rule.start.strftime("%Y-%m-%d"), rule.to_rrule()
+        )
+        return rule.rule_id
+
+    def remove_rule(self, rule_id):
+        self.db.delete_recurring_rule(rule_id)
+
+    def rules(self):
+        return [RecurringRule.from_row(row) for row in self.db.get_recurring_rules()]
+
+    def transactions(self, start, end):
+        return list(recurring_transactions(self.rules(), start, end))
+
+    def total(self, t_type, category=None, end=None):
+        """Sum of occurrences up to end (default today) of matching rules."""
+        end = _as_date(end) or date.today()
+        return sum(
+            rule.amount * rule.count_between(None, end)
+            for rule in self.rules()
+            if rule.t_type == t_type and (category is None or rule.category == category)
+        )
+
+
+class BudgetManager:
+    def __init__(self, db, journal=None):
+        self.db = db
+        self.journal = journal
+
     def set_budget(self, category, amount):
         if amount <= 0:
             raise ValueError("Budget must be positive")
-        self.db.set_budget(category, amount)
+        (self.journal or self.db).set_budget(category, amount)
+
+    def get_spent(self, category):
+        """Stored expenses plus recurring expenses that have fallen due."""
+        return (self.db.get_category_expense(category)
+                + RecurringManager(self.db).total("Expense", category))
 
     def is_over_budget(self, category):
         budget = self.db.get_budget(category)
         if not budget:
             return False
 
-        total_expense = self.db.get_category_expense(category)
+        total_expense = self.get_spent(category)
         return total_expense > budget[0]
 
 
@@ -36,7 +279,42 @@ class SavingsManager:
     def __init__(self, db):
         self.db = db
 
-    def calculate_savings(self):
-        total_income = self.db.get_total_by_type("Income")
-        total_expense = self.db.get_total_by_type("Expense")
+    def calculate_savings(self, as_of=None):
+        """Transactions dated up to as_of plus recurring ones due by then.
+
+        Without as_of every stored transaction counts, and recurring ones
+        are counted up to today.
+        """
+        as_of = _as_date(as_of)
+        end = as_of.isoformat() if as_of else None
+        recurring = RecurringManager(self.db)
+        total_income = self.db.get_total_by_type("Income", end=end) + recurring.total("Income", end=as_of)
+        total_expense = self.db.get_total_by_type("Expense", end=end) + recurring.total("Expense", end=as_of)
         return total_income - total_expense
+
+    def project(self, months=12, start=None, rules=None):
+        """Forward cash flow as (period, income, expense, balance) per month.
+
+        The balance starts from the savings on the day before start (default
+        tomorrow) and adds each month's recurring income minus expense.
+        rules default to the stored rules.
+        """
+        start = _as_date(start) or date.today() + timedelta(days=1)
+        if rules is None:
+            rules = RecurringManager(self.db).rules()
+        income = [0.0] * months
+        expense = [0.0] * months
+        for rule in rules:
+            totals = income if rule.t_type == "Income" else expense
+            for i, n in enumerate(rule.monthly_counts(start, months)):
+                if n:
+                    totals[i] += n * rule.amount
+
+        balance = self.calculate_savings(start - timedelta(days=1))
+        first_month = start.year * 12 + start.month - 1
+        projection = []
+        for i in range(months):
+            balance += income[i] - expense[i]
+            period = _month_start(first_month + i).strftime("%Y-%m")
+            projection.append((period, income[i], expense[i], balance))
+        return projection
@@ -1,7 +1,87 @@
-import tkinter as tk
-from gui import FinanceGUI
+import profiling
+import argparse
+import asyncio
+import csv
+import sys
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = FinanceGUI(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Personal Finance Manager")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the HTTP/JSON service instead of the GUI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="finance.db")
+    parser.add_argument("--archive", nargs="?", const="", metavar="CUTOFF",
+                        help="move transactions before CUTOFF (YYYY-MM-01, default: this month) to archive files and exit")
+    parser.add_argument("--import", dest="import_csv", metavar="CSV",
+                        help="add type,category,amount,date rows from CSV as one undoable batch and exit")
+    parser.add_argument("--undo", action="store_true",
+                        help="undo the latest batch of operations and exit")
+    parser.add_argument("--add-rule", nargs=5, metavar=("TYPE", "CATEGORY", "AMOUNT", "START", "RRULE"),
+                        help="store a recurring transaction, e.g. Expense Rent 900 2025-01-01 FREQ=MONTHLY, and exit")
+    parser.add_argument("--delete-rule", type=int, metavar="ID",
+                        help="delete a recurring transaction rule and exit")
+    parser.add_argument("--rules", action="store_true",
+                        help="list recurring transaction rules and exit")
+    parser.add_argument("--profile", nargs="?", const="trace.json", metavar="TRACE",
+                        help="record startup spans to TRACE (Chrome trace JSON, default trace.json); also SCD_PROFILE")
+    parser.add_argument("--profile-callbacks", action="store_true",
+                        help="with --profile, also time and cProfile every Tk callback")
+    args = parser.parse_args(profiling.configure(sys.argv[1:]))
+
+    if args.import_csv or args.undo:
+        from db import DatabaseHandler
+        from journal import JournalError, OperationJournal
+        db = DatabaseHandler(args.db)
+        journal = OperationJournal(db)
+        if args.import_csv:
+            with open(args.import_csv, newline="") as f:
+                rows = [row[:4] for row in csv.reader(f) if row]
+            journal.import_transactions(rows, f"Import {args.import_csv}")
+            print(f"Imported {len(rows)} transactions")
+        else:
+            try:
+                label = journal.undo()
+            except JournalError as e:
+                db.close()
+                sys.exit(str(e))
+            print(f"Undone: {label}" if label else "Nothing to undo")
+        db.close()
+    elif args.add_rule or args.delete_rule is not None or args.rules:
+        from db import DatabaseHandler
+        from logic import RecurringManager, RecurringRule
+        db = DatabaseHandler(args.db)
+        recurring = RecurringManager(db)
+        if args.add_rule:
+            t_type, category, amount, start, rrule = args.add_rule
+            try:
+                rule = RecurringRule.from_rrule(t_type, category, float(amount), start, rrule)
+            except ValueError as e:
+                db.close()
+                sys.exit(str(e))
+            print(f"Added rule {recurring.add_rule(rule)}")
+        elif args.delete_rule is not None:
+            recurring.remove_rule(args.delete_rule)
+            print(f"Deleted rule {args.delete_rule}")
+        else:
+            for rule in recurring.rules():
+                print(f"{rule.rule_id}: {rule.t_type} {rule.category} {rule.amount} "
+                      f"from {rule.start} {rule.to_rrule()}")
+        db.close()
+    elif args.archive is not None:
+        from db import DatabaseHandler
+        db = DatabaseHandler(args.db)
+        print(f"Archived {db.archive_before(args.archive or None)} transactions")
+        db.close()
+    elif args.headless:
+        from service import serve
+        asyncio.run(serve(args.db, args.host, args.port))
+    else:
+        # Tk is only needed here, so --headless works on Pythons without it
+        import tkinter as tk
+        from gui import FinanceGUI
+        profiling.tracer.mark("import")
+        root = tk.Tk()
+        app = FinanceGUI(root, args.db)
+        profiling.tracer.first_paint(root)
+        root.mainloop()
@@ -0,0 +1,173 @@
+"""Opt-in startup tracing and callback profiling for the Tk apps.
+
+Enable with an environment variable or a command-line flag:
+
+    SCD_PROFILE=trace.json python GymManagementSystem.py
+    python main.py --profile trace.json --profile-callbacks
+
+Spans (import, db init, first query, first paint and, with callback
+profiling, every Tk callback) are written at exit in the Chrome trace
+event format, which Perfetto (ui.perfetto.dev), speedscope and
+chrome://tracing show as a flame chart. With callback profiling a cProfile
+dump is also written next to the trace (trace.json.prof) for snakeviz or
+pstats.
+"""
+import atexit
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+PROFILE_ENV = "SCD_PROFILE"
+CALLBACKS_ENV = "SCD_PROFILE_CALLBACKS"
+
+# Close to interpreter start, since entry points import this module first
+_START = time.perf_counter()
+
+
+class Tracer:
+    def __init__(self):
+        self.path = None
+        self.events = []
+        self.seen = set()
+        self.profiler = None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def enable(self, path, callbacks=False):
+        if self.path is None:
+            atexit.register(self.write)
+        self.path = path
+        if callbacks:
+            self.profiler = cProfile.Profile()
+            install_callback_hook(self)
+
+    def configure(self, argv=None, environ=None):
+        """Enable tracing from --profile[=PATH] / --profile-callbacks or the env.
+
+        Returns argv without the profiling flags.
+        """
+        environ = os.environ if environ is None else environ
+        argv = list(argv or [])
+        path = environ.get(PROFILE_ENV) or None
+        callbacks = environ.get(CALLBACKS_ENV, "") not in ("", "0")
+
+        remaining = []
+        skip = False
+        for i, arg in enumerate(argv):
+            if skip:
+                skip = False
+                continue
+            if arg == "--profile":
+                # The path is optional; never swallow the next flag
+                if i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+                    path = argv[i + 1]
+                    skip = True
+                else:
+                    path = "trace.json"
+            elif arg.startswith("--profile="):
+                path = arg.split("=", 1)[1]
+            elif arg == "--profile-callbacks":
+                callbacks = True
+            else:
+                remaining.append(arg)
+
+        if callbacks and not path:
+            path = "trace.json"
+        if path:
+            self.enable(path, callbacks)
+        return remaining
+
+    def add(self, name, start, end, category="app"):
+        """Record a span from two time.perf_counter() readings."""
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - _START) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def span(self, name, category="app"):
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, category)
+
+    @contextmanager
+    def _span(self, name, category):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), category)
+
+    def once(self, name, category="app"):
+        """Like span(), but only the first use of name is recorded."""
+        if not self.enabled or name in self.seen:
+            return nullcontext()
+        self.seen.add(name)
+        return self._span(name, category)
+
+    def mark(self, name, start=None):
+        """Record name once, as a span from start (default: process start) to now."""
+        if self.enabled and name not in self.seen:
+            self.seen.add(name)
+            self.add(name, _START if start is None else start, time.perf_counter())
+
+    def first_paint(self, root):
+        """Record "first paint" once Tk has drawn the window and gone idle."""
+        if self.enabled:
+            root.after_idle(lambda: self.mark("first paint"))
+
+    def write(self):
+        if not self.enabled:
+            return
+        with self.lock:
+            events = list(self.events)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        if self.profiler is not None:
+            self.profiler.dump_stats(self.path + ".prof")
+
+
+def install_callback_hook(tracer):
+    """Time every Tk -> Python callback and run it under tracer.profiler.
+
+    tkinter routes command, bind and after callbacks through
+    CallWrapper.__call__, so wrapping it covers every handler.
+    """
+    import tkinter
+
+    original = getattr(tkinter.CallWrapper, "_unprofiled_call", tkinter.CallWrapper.__call__)
+    depth = [0]
+
+    def __call__(self, *args):
+        name = getattr(self.func, "__qualname__", repr(self.func))
+        start = time.perf_counter()
+        depth[0] += 1
+        try:
+            # Dialogs run nested event loops; profile the outermost call only
+            if tracer.profiler is not None and depth[0] == 1:
+                return tracer.profiler.runcall(original, self, *args)
+            return original(self, *args)
+        finally:
+            depth[0] -= 1
+            tracer.add(name, start, time.perf_counter(), "callback")
+
+    tkinter.CallWrapper._unprofiled_call = original
+    tkinter.CallWrapper.__call__ = __call__
+
+
+tracer = Tracer()
+configure = tracer.configure
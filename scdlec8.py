@@ -1,62 +1,134 @@
+import profiling
+import asyncio
+import time
 import pyodbc
 import tkinter as tk
 from tkinter import messagebox, simpledialog
+from async_db import AsyncDataAccess, TkAsyncRunner
+from connection import ConnectionManager, ConnectionSettings, load_settings
 
 # ------------------- CONFIG -------------------
-CONN_STR = (
-    r"DRIVER={ODBC Driver 17 for SQL Server};"
-    r"SERVER=DESKTOP-M1HTQTV;"     # change if needed
-    r"DATABASE=master;"            # change to your DB
-    r"Trusted_Connection=yes;"
+# Defaults; override in the [students] section of db.ini or with
+# STUDENTS_DB_* environment variables (e.g. STUDENTS_DB_SERVERS).
+DEFAULT_SETTINGS = ConnectionSettings(
+    servers=["DESKTOP-M1HTQTV"],
+    database="master",
+    driver="ODBC Driver 17 for SQL Server",
 )
 
-def get_conn():
-    try:
-        return pyodbc.connect(CONN_STR)
-    except Exception as e:
-        messagebox.showerror("DB Error", f"Could not connect to database:\n{e}")
-        return None
+DB_TIMEOUT = 30  # seconds before a pending query is abandoned
+
+# Set up in main(); importing this module does no I/O
+store = None
+data = None
+root = runner = None
+name_entry = age_entry = grade_entry = None
+
+
+class StudentStore:
+    """Blocking pyodbc access to the students table.
+
+    Methods raise on failure instead of showing dialogs, so they can run on
+    a worker thread; the GUI reports errors when the result comes back.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or load_settings("students", DEFAULT_SETTINGS)
+        self.connections = ConnectionManager(settings, connect=pyodbc.connect)
+
+    def connect(self):
+        return self.connections.connect()
+
+    def create_table(self):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+            IF OBJECT_ID('students', 'U') IS NULL
+            BEGIN
+                CREATE TABLE students(
+                    id INT IDENTITY(1,1) PRIMARY KEY,
+                    name NVARCHAR(50),
+                    age INT,
+                    grade NVARCHAR(10)
+                )
+            END
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_all(self):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name, age, grade FROM students ORDER BY id")
+            return [tuple(r) for r in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def add(self, name, age, grade):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO students (name, age, grade) VALUES (?, ?, ?)",
+                (name, age, grade)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def update(self, student_id, name, age, grade):
+        """Return False when no student has that ID."""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE students SET name = ?, age = ?, grade = ? WHERE id = ?",
+                (name, age, grade, student_id)
+            )
+            updated = cursor.rowcount > 0
+            conn.commit()
+            return updated
+        finally:
+            conn.close()
+
+    def delete(self, student_id):
+        """Return False when no student has that ID."""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM students WHERE id = ?", (student_id,))
+            deleted = cursor.rowcount > 0
+            conn.commit()
+            return deleted
+        finally:
+            conn.close()
+
+
+def run_async(method, *args, on_success=None, error_title="DB Error"):
+    """Run a StudentStore method off the Tk thread and report failures."""
+    def on_error(e):
+        if isinstance(e, asyncio.TimeoutError):
+            messagebox.showerror(error_title, "The database did not respond in time.")
+        else:
+            messagebox.showerror(error_title, str(e))
+    return runner.submit(data.call(method, *args), on_success, on_error)
 
 # ------------------- DB SETUP -------------------
 def create_table():
-    conn = get_conn()
-    if not conn:
-        return
-    try:
-        cursor = conn.cursor()
-        cursor.execute("""
-        IF OBJECT_ID('students', 'U') IS NULL
-        BEGIN
-            CREATE TABLE students(
-                id INT IDENTITY(1,1) PRIMARY KEY,
-                name NVARCHAR(50),
-                age INT,
-                grade NVARCHAR(10)
-            )
-        END
-        """)
-        conn.commit()
-    except Exception as e:
-        messagebox.showerror("DB Error", f"Error creating table:\n{e}")
-    finally:
-        conn.close()
-
-def get_all_students():
-    conn = get_conn()
-    if not conn:
-        return []
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, age, grade FROM students ORDER BY id")
-        rows = cursor.fetchall()
-        return rows
-    except Exception as e:
-        messagebox.showerror("DB Error", f"Could not fetch students:\n{e}")
-        return []
-    finally:
-        conn.close()
+    start = time.perf_counter()
+    run_async("create_table", on_success=lambda _: profiling.tracer.mark("first query", start),
+              error_title="Error creating table")
+
+def get_all_students(on_success):
+    run_async("get_all", on_success=on_success, error_title="Could not fetch students")
 
 # ------------------- CRUD FUNCTIONS -------------------
+def parse_age(age):
+    return int(age) if age != "" else None
+
 def add_student():
     name = name_entry.get().strip()
     age = age_entry.get().strip()
@@ -65,28 +137,19 @@ def add_student():
     if not name:
         messagebox.showwarning("Validation", "Name is required.")
         return
-
-    conn = get_conn()
-    if not conn:
-        return
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO students (name, age, grade) VALUES (?, ?, ?)",
-            (name, int(age) if age != "" else None, grade)
-        )
-        conn.commit()
-        messagebox.showinfo("Success", "Student added.")
-        clear_inputs()
+        age = parse_age(age)
     except ValueError:
         messagebox.showwarning("Validation", "Age must be a number (or leave blank).")
-    except Exception as e:
-        messagebox.showerror("DB Error", str(e))
-    finally:
-        conn.close()
+        return
+
+    def done(_):
+        messagebox.showinfo("Success", "Student added.")
+        clear_inputs()
+
+    run_async("add", name, age, grade, on_success=done)
 
 def view_students():
-    rows = get_all_students()
     view_win = tk.Toplevel(root)
     view_win.title("All Students")
     view_win.geometry("420x300")
@@ -98,55 +161,54 @@ def view_students():
     # Listbox
     listbox = tk.Listbox(view_win, font=("Courier", 10))
     listbox.pack(fill="both", expand=True, padx=8, pady=4)
-    if not rows:
-        listbox.insert(tk.END, "No students found.")
-    else:
-        for r in rows:
-            id_, name, age, grade = r
-            age_str = str(age) if age is not None else ""
-            listbox.insert(tk.END, f"{id_:<6}{name:<25}{age_str:<8}{grade:<8}")
+    listbox.insert(tk.END, "Loading...")
+
+    def show(rows):
+        if not listbox.winfo_exists():
+            return
+        listbox.delete(0, tk.END)
+        if not rows:
+            listbox.insert(tk.END, "No students found.")
+        else:
+            for r in rows:
+                id_, name, age, grade = r
+                age_str = str(age) if age is not None else ""
+                listbox.insert(tk.END, f"{id_:<6}{name:<25}{age_str:<8}{grade:<8}")
+
+    pending = get_all_students(show)
+
+    def close():
+        pending.cancel()
+        view_win.destroy()
 
     # Close button
-    tk.Button(view_win, text="Close", command=view_win.destroy).pack(pady=6)
+    tk.Button(view_win, text="Close", command=close).pack(pady=6)
+    view_win.protocol("WM_DELETE_WINDOW", close)
 
 def update_student():
+    student_id = simpledialog.askinteger("Update Student", "Enter student ID to update:", parent=root, minvalue=1)
+    if student_id is None:
+        return
+    name = name_entry.get().strip()
+    age = age_entry.get().strip()
+    grade = grade_entry.get().strip()
+    if not name:
+        messagebox.showwarning("Validation", "Name is required to update.")
+        return
     try:
-        student_id = simpledialog.askinteger("Update Student", "Enter student ID to update:", parent=root, minvalue=1)
-        if student_id is None:
-            return
-        name = name_entry.get().strip()
-        age = age_entry.get().strip()
-        grade = grade_entry.get().strip()
-        if not name:
-            messagebox.showwarning("Validation", "Name is required to update.")
-            return
+        age = parse_age(age)
+    except ValueError:
+        messagebox.showwarning("Validation", "Age must be a number (or leave blank).")
+        return
 
-        conn = get_conn()
-        if not conn:
-            return
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(1) FROM students WHERE id = ?", (student_id,))
-        exists = cursor.fetchone()[0]
-        if not exists:
+    def done(updated):
+        if not updated:
             messagebox.showwarning("Not found", f"No student with ID {student_id}")
             return
-
-        cursor.execute(
-            "UPDATE students SET name = ?, age = ?, grade = ? WHERE id = ?",
-            (name, int(age) if age != "" else None, grade, student_id)
-        )
-        conn.commit()
         messagebox.showinfo("Success", f"Student ID {student_id} updated.")
         clear_inputs()
-    except ValueError:
-        messagebox.showwarning("Validation", "Age must be a number (or leave blank).")
-    except Exception as e:
-        messagebox.showerror("DB Error", str(e))
-    finally:
-        try:
-            conn.close()
-        except:
-            pass
+
+    run_async("update", student_id, name, age, grade, on_success=done)
 
 def delete_student():
     student_id = simpledialog.askinteger("Delete Student", "Enter student ID to delete:", parent=root, minvalue=1)
@@ -156,24 +218,13 @@ def delete_student():
     if not messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete student ID {student_id}?"):
         return
 
-    conn = get_conn()
-    if not conn:
-        return
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(1) FROM students WHERE id = ?", (student_id,))
-        exists = cursor.fetchone()[0]
-        if not exists:
+    def done(deleted):
+        if not deleted:
             messagebox.showwarning("Not found", f"No student with ID {student_id}")
             return
-
-        cursor.execute("DELETE FROM students WHERE id = ?", (student_id,))
-        conn.commit()
         messagebox.showinfo("Deleted", f"Student ID {student_id} deleted.")
-    except Exception as e:
-        messagebox.showerror("DB Error", str(e))
-    finally:
-        conn.close()
+
+    run_async("delete", student_id, on_success=done)
 
 # ------------------- UTIL -------------------
 def clear_inputs():
@@ -182,36 +233,52 @@ def clear_inputs():
     grade_entry.delete(0, tk.END)
 
 # ------------------- GUI -------------------
-create_table()
+def main():
+    global store, data, root, runner, name_entry, age_entry, grade_entry
+    profiling.tracer.mark("import")
+
+    with profiling.tracer.span("db init"):
+        store = StudentStore()
+        data = AsyncDataAccess(store, timeout=DB_TIMEOUT)
+
+    root = tk.Tk()
+    root.title("Student Entry GUI")
+    root.geometry("360x300")
+    root.resizable(False, False)
+    runner = TkAsyncRunner(root)
+    # Off the Tk thread, so an unreachable server does not freeze launch
+    create_table()
+
+    # Labels & entries
+    tk.Label(root, text="Name").pack(pady=(10,0))
+    name_entry = tk.Entry(root, width=30)
+    name_entry.pack()
 
-root = tk.Tk()
-root.title("Student Entry GUI")
-root.geometry("360x300")
-root.resizable(False, False)
+    tk.Label(root, text="Age").pack(pady=(8,0))
+    age_entry = tk.Entry(root, width=30)
+    age_entry.pack()
 
-# Labels & entries
-tk.Label(root, text="Name").pack(pady=(10,0))
-name_entry = tk.Entry(root, width=30)
-name_entry.pack()
+    tk.Label(root, text="Grade").pack(pady=(8,0))
+    grade_entry = tk.Entry(root, width=30)
+    grade_entry.pack()
 
-tk.Label(root, text="Age").pack(pady=(8,0))
-age_entry = tk.Entry(root, width=30)
-age_entry.pack()
+    # Buttons row
+    btn_frame = tk.Frame(root)
+    btn_frame.pack(pady=14)
 
-tk.Label(root, text="Grade").pack(pady=(8,0))
-grade_entry = tk.Entry(root, width=30)
-grade_entry.pack()
+    tk.Button(btn_frame, text="Add Student", width=14, command=add_student).grid(row=0, column=0, padx=6, pady=3)
+    tk.Button(btn_frame, text="View Students", width=14, command=view_students).grid(row=1, column=0, padx=6, pady=3)
+    tk.Button(btn_frame, text="Update Student", width=14, command=update_student).grid(row=0, column=1, padx=6, pady=3)
+    tk.Button(btn_frame, text="Delete Student", width=14, command=delete_student).grid(row=1, column=1, padx=6, pady=3)
 
-# Buttons row
-btn_frame = tk.Frame(root)
-btn_frame.pack(pady=14)
+    # small help label
+    tk.Label(root, text="To update/delete provide the record ID when prompted.", fg="gray", wraplength=320).pack(pady=(6,4))
 
-tk.Button(btn_frame, text="Add Student", width=14, command=add_student).grid(row=0, column=0, padx=6, pady=3)
-tk.Button(btn_frame, text="View Students", width=14, command=view_students).grid(row=1, column=0, padx=6, pady=3)
-tk.Button(btn_frame, text="Update Student", width=14, command=update_student).grid(row=0, column=1, padx=6, pady=3)
-tk.Button(btn_frame, text="Delete Student", width=14, command=delete_student).grid(row=1, column=1, padx=6, pady=3)
+    profiling.tracer.first_paint(root)
+    root.mainloop()
 
-# small help label
-tk.Label(root, text="To update/delete provide the record ID when prompted.", fg="gray", wraplength=320).pack(pady=(6,4))
 
-root.mainloop()
+if __name__ == "__main__":
+    import sys
+    profiling.configure(sys.argv[1:])
+    main()
@@ -0,0 +1,177 @@
+"""Trainer session scheduling.
+
+Every trainer and every member has an IntervalIndex of booked sessions,
+kept sorted by start time, so checking a new slot for overlaps is a binary
+search rather than a scan of all sessions. auto_assign hands requests to
+the least loaded trainer with the right specialization.
+
+Sessions already in the database are loaded as they are, even if they
+overlap; the scheduler only refuses to add new overlaps. The database
+re-checks each insert, since two schedulers can plan the same week at once.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+Session = namedtuple("Session", "trainer_id member_id start end")
+
+SLOT_MINUTES = 60
+DAY_START_HOUR = 6
+DAY_END_HOUR = 22
+
+
+class ScheduleConflict(Exception):
+    pass
+
+
+class IntervalIndex:
+    """Sorted [start, end) intervals for one person.
+
+    add refuses overlaps unless strict is False, which is only used to load
+    stored sessions. Lookups scan back from end by the longest interval
+    seen, so they stay correct when stored intervals overlap.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.intervals = []
+        self.longest = None
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlapping(self, start, end):
+        """Return the booked intervals that overlap [start, end)."""
+        if self.longest is None:
+            return []
+        # Only intervals starting after start - longest can reach past start
+        lo = bisect_right(self.starts, start - self.longest)
+        hi = bisect_left(self.starts, end)
+        return [iv for iv in self.intervals[lo:hi] if iv[1] > start]
+
+    def is_free(self, start, end):
+        return not self.overlapping(start, end)
+
+    def add(self, start, end, item=None, strict=True):
+        if strict and not self.is_free(start, end):
+            raise ScheduleConflict(f"{start} - {end} overlaps an existing session")
+        if self.longest is None or end - start > self.longest:
+            self.longest = end - start
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.intervals.insert(i, (start, end, item))
+
+    def remove(self, start):
+        i = bisect_left(self.starts, start)
+        if i < len(self.starts) and self.starts[i] == start:
+            del self.starts[i]
+            del self.intervals[i]
+
+
+def week_slots(week_start, slot_minutes=SLOT_MINUTES,
+               day_start=DAY_START_HOUR, day_end=DAY_END_HOUR, days=7):
+    """All (start, end) slots in a week, in time order."""
+    length = timedelta(minutes=slot_minutes)
+    slots = []
+    for day in range(days):
+        t = week_start + timedelta(days=day, hours=day_start)
+        close = week_start + timedelta(days=day, hours=day_end)
+        while t + length <= close:
+            slots.append((t, t + length))
+            t += length
+    return slots
+
+
+class TrainerScheduler:
+    def __init__(self, trainers, sessions=()):
+        """trainers are Trainer objects or (id, name, specialization) rows."""
+        self.specialization = {}
+        for t in trainers:
+            if isinstance(t, tuple):
+                trainer_id, _, specialization = t
+            else:
+                trainer_id, specialization = t.trainer_id, t.specialization
+            self.specialization[trainer_id] = specialization
+        self.trainer_index = defaultdict(IntervalIndex)
+        self.member_index = defaultdict(IntervalIndex)
+        for session in sessions:
+            self._add(Session(*session), strict=False)
+
+    def _add(self, session, strict=True):
+        self.trainer_index[session.trainer_id].add(session.start, session.end, session, strict)
+        self.member_index[session.member_id].add(session.start, session.end, session, strict)
+
+    def conflicts(self, trainer_id, member_id, start, end):
+        return (self.trainer_index[trainer_id].overlapping(start, end)
+                + self.member_index[member_id].overlapping(start, end))
+
+    def book(self, trainer_id, member_id, start, end):
+        if trainer_id not in self.specialization:
+            raise ValueError(f"Unknown trainer {trainer_id}")
+        if end <= start:
+            raise ValueError("Session must end after it starts")
+        if not (self.trainer_index[trainer_id].is_free(start, end)
+                and self.member_index[member_id].is_free(start, end)):
+            raise ScheduleConflict("Trainer or member already booked at that time")
+        session = Session(trainer_id, member_id, start, end)
+        self._add(session)
+        return session
+
+    def load(self, trainer_id):
+        return len(self.trainer_index[trainer_id])
+
+    def auto_assign(self, requests, slots):
+        """Book each (member_id, specialization) request into one of slots.
+
+        specialization None accepts any trainer. Each request goes to the
+        least loaded matching trainer that has a slot free for both sides.
+        Returns (booked sessions, requests that could not be placed).
+        """
+        heaps = {}
+        for trainer_id, specialization in self.specialization.items():
+            for key in (specialization, None):
+                heaps.setdefault(key, []).append((self.load(trainer_id), trainer_id))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        # Per trainer, slots before this position are known to be taken
+        cursor = defaultdict(int)
+
+        booked, unplaced = [], []
+        for member_id, specialization in requests:
+            heap = heaps.get(specialization)
+            session = None
+            skipped = []
+            while heap and session is None:
+                load, trainer_id = heapq.heappop(heap)
+                if load != self.load(trainer_id):
+                    # Stale entry: the trainer was booked through another heap
+                    heapq.heappush(heap, (self.load(trainer_id), trainer_id))
+                    continue
+                session = self._first_free(trainer_id, member_id, slots, cursor)
+                if session is None:
+                    skipped.append((load, trainer_id))
+                else:
+                    heapq.heappush(heap, (load + 1, trainer_id))
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+
+            if session is None:
+                unplaced.append((member_id, specialization))
+            else:
+                booked.append(session)
+        return booked, unplaced
+
+    def _first_free(self, trainer_id, member_id, slots, cursor):
+        trainer = self.trainer_index[trainer_id]
+        member = self.member_index[member_id]
+        i = cursor[trainer_id]
+        while i < len(slots) and not trainer.is_free(*slots[i]):
+            i += 1
+        cursor[trainer_id] = i
+        for start, end in slots[i:]:
+            if trainer.is_free(start, end) and member.is_free(start, end):
+                session = Session(trainer_id, member_id, start, end)
+                self._add(session)
+                return session
+        return None
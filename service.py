@@ -0,0 +1,250 @@
+"""Headless finance service with a local HTTP/JSON API.
+
+Runs the same BudgetManager / SavingsManager / DatabaseHandler logic as the
+Tk app, without Tk, so scripts and several clients can drive it at once.
+
+Endpoints:
+    POST /transactions      {"type", "category", "amount", "date"?}
+    POST /budgets           {"category", "amount"}
+    GET  /budgets/<name>    budget limit, spent amount and over-budget flag
+    GET  /savings           {"savings": ...}
+    GET  /transactions      list of stored transactions
+"""
+import asyncio
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from urllib.parse import unquote
+
+from db import DatabaseHandler, WriterQueue
+from logic import Transaction, BudgetManager, SavingsManager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+def _insert_transaction(cursor, row):
+    cursor.execute("INSERT INTO transactions (type, category, amount, date) VALUES (?, ?, ?, ?)", row)
+
+
+def _check_category(category):
+    if not isinstance(category, str) or not category.strip():
+        raise ValueError("Category is required")
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; expected YYYY-MM-DD") from None
+
+
+class ConnectionPool:
+    """Fixed-size pool of DatabaseHandler objects shared across threads."""
+
+    def __init__(self, db_name, size=4):
+        if db_name == ":memory:":
+            raise ValueError("The service needs a database file; ':memory:' is private to one connection")
+        self._handlers = queue.Queue()
+        for _ in range(size):
+            self._handlers.put(DatabaseHandler(db_name, check_same_thread=False))
+        self.size = size
+
+    @contextmanager
+    def acquire(self):
+        handler = self._handlers.get()
+        try:
+            yield handler
+        finally:
+            self._handlers.put(handler)
+
+    def close(self):
+        for _ in range(self.size):
+            self._handlers.get().close()
+
+
+class FinanceService:
+    """Async facade over the finance logic.
+
+    Reads run on pooled connections in a thread pool. Writes go through one
+    db.WriterQueue: requests that arrive together are committed in one
+    transaction, each in its own savepoint, so a burst costs one commit and
+    a bad row only fails its own request.
+    """
+
+    def __init__(self, db_name="finance.db", pool_size=4, max_batch=500):
+        self.pool = ConnectionPool(db_name, pool_size)
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self._readers = ThreadPoolExecutor(max_workers=pool_size)
+        self._write_executor = ThreadPoolExecutor(max_workers=1)
+        self.writer_queue = None
+        self.writer = None
+
+    async def start(self):
+        self.writer_queue = WriterQueue(self.db_name, self.max_batch)
+        self.writer = DatabaseHandler(self.db_name, check_same_thread=False,
+                                      writer=self.writer_queue)
+
+    async def close(self):
+        self._readers.shutdown()
+        self._write_executor.shutdown()
+        if self.writer_queue:
+            # Writes already queued are applied before the thread stops
+            await asyncio.get_running_loop().run_in_executor(None, self.writer_queue.close)
+            self.writer.close()
+            self.writer_queue = self.writer = None
+        self.pool.close()
+
+    async def _write(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._write_executor, func, self.writer, *args
+        )
+
+    async def _read(self, func, *args):
+        def call():
+            with self.pool.acquire() as handler:
+                return func(handler, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._readers, call)
+
+    # ---------- Operations ----------
+    async def add_transaction(self, t_type, category, amount, day=None):
+        _check_category(category)
+        transaction = Transaction(t_type, category, amount)
+        if day:
+            transaction.date = _parse_date(day)
+        row = (transaction.t_type, transaction.category, transaction.amount, transaction.date)
+        await asyncio.wrap_future(self.writer_queue.submit(_insert_transaction, row))
+
+    async def set_budget(self, category, amount):
+        _check_category(category)
+        await self._write(lambda db: BudgetManager(db).set_budget(category, amount))
+
+    async def get_budget(self, category):
+        def query(db):
+            budget = db.get_budget(category)
+            return {
+                "category": category,
+                "limit": budget[0] if budget else None,
+                "spent": BudgetManager(db).get_spent(category),
+                "over_budget": BudgetManager(db).is_over_budget(category),
+            }
+        return await self._read(query)
+
+    async def calculate_savings(self):
+        return await self._read(lambda db: SavingsManager(db).calculate_savings())
+
+    async def fetch_transactions(self):
+        return await self._read(lambda db: db.fetch_transactions())
+
+
+# ---------- HTTP ----------
+async def handle_request(service, method, path, body):
+    """Dispatch one request and return (status, payload)."""
+    data = json.loads(body) if body else {}
+
+    if path == "/transactions":
+        if method == "POST":
+            await service.add_transaction(
+                data.get("type"), data.get("category"),
+                float(data.get("amount", 0)), data.get("date")
+            )
+            return 201, {"status": "ok"}
+        if method == "GET":
+            rows = await service.fetch_transactions()
+            return 200, [
+                {"id": r[0], "type": r[1], "category": r[2], "amount": r[3], "date": r[4]}
+                for r in rows
+            ]
+        return 405, {"error": "Method not allowed"}
+
+    if path == "/budgets":
+        if method != "POST":
+            return 405, {"error": "Method not allowed"}
+        await service.set_budget(data.get("category"), float(data.get("amount", 0)))
+        return 201, {"status": "ok"}
+
+    if path.startswith("/budgets/"):
+        if method != "GET":
+            return 405, {"error": "Method not allowed"}
+        return 200, await service.get_budget(unquote(path[len("/budgets/"):]))
+
+    if path == "/savings":
+        if method != "GET":
+            return 405, {"error": "Method not allowed"}
+        return 200, {"savings": await service.calculate_savings()}
+
+    return 404, {"error": "Not found"}
+
+
+async def _serve_client(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            body = await reader.readexactly(length) if length else b""
+
+            try:
+                status, payload = await handle_request(service, method, path, body)
+            except (ValueError, TypeError) as e:
+                status, payload = 400, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+
+            content = json.dumps(payload).encode()
+            keep_alive = headers.get("connection", "").lower() != "close"
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                + content
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    await service.start()
+    return await asyncio.start_server(
+        lambda r, w: _serve_client(service, r, w), host, port
+    )
+
+
+async def serve(db_name="finance.db", host=DEFAULT_HOST, port=DEFAULT_PORT):
+    service = FinanceService(db_name)
+    server = await start_server(service, host, port)
+    print(f"Finance service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
@@ -0,0 +1,226 @@
+"""Binary columnar snapshots of the transactions table.
+
+A snapshot file holds one fixed-width column per field, laid out so the
+whole file can be mmap-ed and each column viewed in place:
+
+    header      64 bytes, see HEADER
+    amount      float64 x capacity
+    day         int32   x capacity   (days since 1970-01-01)
+    category    uint16  x capacity   (index into the category table)
+    type        uint8   x capacity   (index into TYPES)
+    categories  UTF-8 JSON list of category names
+
+All values are little-endian. Columns are allocated with spare capacity so
+append_snapshot can add new rows in place; the file is only rewritten when
+that capacity runs out.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"FINSNAP1"
+VERSION = 1
+# magic, version, row_count, capacity, last_id, categories_offset, categories_length
+HEADER = struct.Struct("<8sIxxxxQQqQQ")
+HEADER_SIZE = 64
+TYPES = ["Income", "Expense"]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# (name, array typecode, numpy dtype, item size) in file order
+COLUMNS = [
+    ("amount", "d", "<f8", 8),
+    ("day", "i", "<i4", 4),
+    ("category", "H", "<u2", 2),
+    ("type", "B", "u1", 1),
+]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _column_offsets(capacity):
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, _, _, size in COLUMNS:
+        offsets[name] = offset
+        offset += size * capacity
+    return offsets, offset
+
+
+def _read_header(f):
+    f.seek(0)
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise SnapshotError("Snapshot file is truncated")
+    magic, version, row_count, capacity, last_id, cat_offset, cat_length = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError("Not a transaction snapshot file")
+    f.seek(cat_offset)
+    categories = json.loads(f.read(cat_length).decode("utf-8"))
+    return row_count, capacity, last_id, categories
+
+
+def _encode_rows(rows, categories):
+    """Turn (id, type, category, amount, date) rows into column arrays."""
+    codes = {name: i for i, name in enumerate(categories)}
+    columns = {name: array(typecode) for name, typecode, _, _ in COLUMNS}
+    last_id = None
+    for row_id, t_type, category, amount, day in rows:
+        if category not in codes:
+            codes[category] = len(categories)
+            categories.append(category)
+        columns["amount"].append(amount)
+        columns["day"].append(date.fromisoformat(day).toordinal() - EPOCH_ORDINAL)
+        columns["category"].append(codes[category])
+        columns["type"].append(TYPES.index(t_type))
+        last_id = row_id
+    if sys.byteorder == "big":
+        for column in columns.values():
+            column.byteswap()
+    return columns, last_id
+
+
+def _write_file(path, columns, row_count, capacity, last_id, categories):
+    offsets, end = _column_offsets(capacity)
+    encoded = json.dumps(categories).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, row_count, capacity, last_id,
+                            end, len(encoded)).ljust(HEADER_SIZE, b"\0"))
+        f.truncate(end)
+        for name, _, _, _ in COLUMNS:
+            f.seek(offsets[name])
+            f.write(columns[name].tobytes())
+        f.seek(end)
+        f.write(encoded)
+
+
+def _fetch_rows(db, after_id):
+    # Through fetch_transactions so rows moved by archive_before are included
+    return db.fetch_transactions(after_id=after_id)
+
+
+def export_snapshot(db, path, capacity=None):
+    """Write every transaction in db to a new snapshot file.
+
+    Returns the number of rows written.
+    """
+    categories = []
+    columns, last_id = _encode_rows(_fetch_rows(db, -1), categories)
+    row_count = len(columns["amount"])
+    capacity = max(capacity or 0, row_count * 2, 1024)
+    _write_file(path, columns, row_count, capacity, last_id or 0, categories)
+    return row_count
+
+
+def append_snapshot(db, path):
+    """Append transactions added since the snapshot was written.
+
+    Only ids above the snapshot's last_id are read, so rows removed by a
+    journal undo (or put back by redo) are not reflected; re-export instead.
+
+    Returns the number of rows appended.
+    """
+    with open(path, "r+b") as f:
+        row_count, capacity, last_id, categories = _read_header(f)
+        columns, new_last_id = _encode_rows(_fetch_rows(db, last_id), categories)
+        added = len(columns["amount"])
+        if not added:
+            return 0
+
+        if row_count + added <= capacity:
+            offsets, end = _column_offsets(capacity)
+            for name, _, _, size in COLUMNS:
+                f.seek(offsets[name] + row_count * size)
+                f.write(columns[name].tobytes())
+            encoded = json.dumps(categories).encode("utf-8")
+            f.seek(end)
+            f.write(encoded)
+            f.truncate()
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, row_count + added, capacity,
+                                new_last_id, end, len(encoded)))
+            return added
+
+        # Out of room: read the existing columns back and rewrite bigger.
+        offsets, _ = _column_offsets(capacity)
+        merged = {}
+        for name, typecode, _, size in COLUMNS:
+            f.seek(offsets[name])
+            merged[name] = array(typecode, f.read(row_count * size))
+            merged[name].extend(columns[name])
+
+    total = row_count + added
+    _write_file(path, merged, total, max(total * 2, capacity * 2), new_last_id, categories)
+    return added
+
+
+class Snapshot:
+    """Read-only, zero-copy view of a snapshot file.
+
+    Columns are NumPy arrays when NumPy is installed and typed memoryviews
+    otherwise; both read straight from the mapped file. Drop any column
+    references before calling close().
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self.row_count, self.capacity, self.last_id, self.categories = _read_header(self._file)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        offsets, _ = _column_offsets(self.capacity)
+        self._views = []
+        for name, typecode, dtype, size in COLUMNS:
+            if numpy is not None:
+                column = numpy.frombuffer(self._map, dtype=dtype, count=self.row_count,
+                                          offset=offsets[name])
+            else:
+                view = memoryview(self._map)[offsets[name]:offsets[name] + self.row_count * size]
+                self._views.append(view)
+                column = view.cast(typecode)
+                self._views.append(column)
+            setattr(self, name, column)
+
+    def __len__(self):
+        return self.row_count
+
+    def category_name(self, code):
+        return self.categories[code]
+
+    def type_name(self, code):
+        return TYPES[code]
+
+    @staticmethod
+    def to_date(day):
+        return date.fromordinal(int(day) + EPOCH_ORDINAL)
+
+    def close(self):
+        for name, _, _, _ in COLUMNS:
+            setattr(self, name, None)
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_snapshot(path):
+    return Snapshot(path)
@@ -0,0 +1,263 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from gym_stats import age_band_sql
+
+
+class LocalGymDatabase:
+    """SQLite stand-in for GymManagementSystem.Database.
+
+    Exposes the same methods and row shapes so benchmarks and tests can
+    exercise gym code paths without a SQL Server instance. Like
+    LocalStudentStore, calls may come from AsyncDataAccess worker threads,
+    so they are serialized on one connection.
+    """
+
+    def __init__(self, db_name=":memory:"):
+        self.db_name = db_name
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.create_tables()
+
+    def create_tables(self):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS members (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    age INTEGER NOT NULL,
+                    phone TEXT NOT NULL,
+                    membership_type TEXT NOT NULL,
+                    join_date TEXT NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS trainers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    specialization TEXT NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS training_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    trainer_id INTEGER NOT NULL,
+                    member_id INTEGER NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT NOT NULL
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_trainer ON training_sessions (trainer_id, start_time)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_member ON training_sessions (member_id, start_time)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start ON training_sessions (start_time)")
+            self.conn.commit()
+
+    def add_member(self, member):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute(
+                "INSERT INTO members (name, age, phone, membership_type, join_date) VALUES (?, ?, ?, ?, ?)",
+                (member.name, member.age, member.phone, member.membership_type, member.join_date)
+            )
+            self.conn.commit()
+            return cur.lastrowid
+
+    def add_members(self, members):
+        """Bulk insert used to seed large data sets."""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO members (name, age, phone, membership_type, join_date) VALUES (?, ?, ?, ?, ?)",
+                ((m.name, m.age, m.phone, m.membership_type, m.join_date) for m in members)
+            )
+            self.conn.commit()
+
+    def get_all_members(self):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("SELECT id, name, age, phone, membership_type, join_date FROM members ORDER BY id")
+            return [tuple(r) for r in cur.fetchall()]
+
+    def delete_member(self, member_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT age, membership_type, join_date FROM members WHERE id = ?", (member_id,)
+            ).fetchone()
+            self.conn.execute("DELETE FROM members WHERE id = ?", (member_id,))
+            self.conn.commit()
+            return tuple(row) if row else None
+
+    def add_trainer(self, trainer):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("INSERT INTO trainers (name, specialization) VALUES (?, ?)",
+                        (trainer.name, trainer.specialization))
+            self.conn.commit()
+            return cur.lastrowid
+
+    def get_all_trainers(self):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("SELECT id, name, specialization FROM trainers ORDER BY id")
+            return [tuple(r) for r in cur.fetchall()]
+
+    def add_sessions(self, sessions):
+        """Insert sessions that do not overlap a stored one; return those saved."""
+        with self.lock:
+            saved = []
+            # BEGIN IMMEDIATE takes the write lock before the first check
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for s in sessions:
+                    start, end = s[2].isoformat(), s[3].isoformat()
+                    cur = self.conn.execute("""
+                        INSERT INTO training_sessions (trainer_id, member_id, start_time, end_time)
+                        SELECT ?, ?, ?, ?
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM training_sessions
+                            WHERE (trainer_id = ? OR member_id = ?)
+                              AND start_time < ? AND end_time > ?
+                        )
+                    """, (s[0], s[1], start, end, s[0], s[1], end, start))
+                    if cur.rowcount:
+                        saved.append(s)
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            return saved
+
+    def get_sessions(self, start, end):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("""
+                SELECT trainer_id, member_id, start_time, end_time
+                FROM training_sessions
+                WHERE start_time < ? AND end_time > ?
+                ORDER BY start_time
+            """, (end.isoformat(), start.isoformat()))
+            return [(t, m, datetime.fromisoformat(s), datetime.fromisoformat(e))
+                    for t, m, s, e in cur.fetchall()]
+
+    def get_membership_aggregates(self):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("SELECT membership_type, COUNT(*) FROM members GROUP BY membership_type")
+            by_type = dict(cur.fetchall())
+            cur.execute("SELECT substr(join_date, 1, 7), COUNT(*) FROM members GROUP BY substr(join_date, 1, 7)")
+            by_month = dict(cur.fetchall())
+            cur.execute(f"SELECT {age_band_sql()} AS band, COUNT(*) FROM members GROUP BY band")
+            by_age_band = dict(cur.fetchall())
+            return {"by_type": by_type, "by_month": by_month, "by_age_band": by_age_band}
+
+    def search_members(self, search_term):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("""
+                SELECT id, name, age, phone, membership_type, join_date
+                FROM members
+                WHERE name LIKE ?
+                ORDER BY id
+            """, (f"%{search_term}%",))
+            return [tuple(r) for r in cur.fetchall()]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class LocalStudentStore:
+    """SQLite stand-in for scdlec8.StudentStore.
+
+    latency adds a fixed delay to every call to mimic a slow remote server.
+    Calls may come from several worker threads, so they are serialized on
+    one connection.
+    """
+
+    def __init__(self, db_name=":memory:", latency=0.0):
+        self.latency = latency
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.create_table()
+
+    def _run(self, sql, params=()):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            cur = self.conn.execute(sql, params)
+            rows = cur.fetchall()
+            self.conn.commit()
+            return cur, rows
+
+    def create_table(self):
+        self._run("""
+            CREATE TABLE IF NOT EXISTS students (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                age INTEGER,
+                grade TEXT
+            )
+        """)
+
+    def get_all(self):
+        _, rows = self._run("SELECT id, name, age, grade FROM students ORDER BY id")
+        return rows
+
+    def add(self, name, age, grade):
+        cur, _ = self._run("INSERT INTO students (name, age, grade) VALUES (?, ?, ?)", (name, age, grade))
+        return cur.lastrowid
+
+    def update(self, student_id, name, age, grade):
+        cur, _ = self._run(
+            "UPDATE students SET name = ?, age = ?, grade = ? WHERE id = ?",
+            (name, age, grade, student_id)
+        )
+        return cur.rowcount > 0
+
+    def delete(self, student_id):
+        cur, _ = self._run("DELETE FROM students WHERE id = ?", (student_id,))
+        return cur.rowcount > 0
+
+
+class FakeODBCError(Exception):
+    pass
+
+
+class FakeConnection:
+    def __init__(self, server, autocommit):
+        self.server = server
+        self.autocommit = autocommit
+        self.timeout = 0
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeODBCServers:
+    """Fake ODBC driver fronting several named servers.
+
+    connect() takes the same arguments as pyodbc.connect. Servers can be
+    taken down or given a login latency; a login slower than the timeout
+    fails after waiting out the timeout, as the real driver does.
+    """
+
+    def __init__(self):
+        self.latency = {}
+        self.down = set()
+        self.attempts = []
+
+    def connect(self, conn_str, timeout=0, autocommit=False):
+        params = dict(part.split("=", 1) for part in conn_str.split(";") if "=" in part)
+        server = params["SERVER"]
+        self.attempts.append(server)
+        delay = self.latency.get(server, 0.0)
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise FakeODBCError(f"{server}: login timeout expired")
+        time.sleep(delay)
+        if server in self.down:
+            raise FakeODBCError(f"{server}: server does not exist or access denied")
+        return FakeConnection(server, autocommit)
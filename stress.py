@@ -0,0 +1,134 @@
+"""Multi-process stress test for concurrent access to a finance database.
+
+Usage:
+    python stress.py --writers 4 --readers 4 --seconds 5
+    python stress.py --no-wal            # compare against rollback journal
+    python stress.py --writer-queue      # also run writes through WriterQueue
+
+Writer processes insert batches of transactions through DatabaseHandler;
+reader processes run the aggregate queries the GUI uses. With
+--writer-queue each writer process also gets a run where several threads
+submit through one WriterQueue, reported next to the direct-write run.
+Prints per-role throughput and error counts as JSON.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from db import DatabaseHandler, WriterQueue
+
+
+def _write_loop(db, seconds, batch, counts):
+    rows = [("Expense", "Food", 10.0, "2025-01-01")] * batch
+    ops = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if batch == 1:
+                db.add_transaction(*rows[0])
+            else:
+                db.add_transactions(rows)
+            ops += batch
+        except sqlite3.OperationalError:
+            errors += 1
+    counts.append((ops, errors))
+
+
+def writer_process(db_name, seconds, batch, wal, results, threads=0):
+    """threads > 0 writes from that many threads through one WriterQueue."""
+    counts = []
+    if threads:
+        writer = WriterQueue(db_name)
+        db = DatabaseHandler(db_name, wal=wal, writer=writer)
+        workers = [
+            threading.Thread(target=_write_loop, args=(db, seconds, batch, counts))
+            for _ in range(threads)
+        ]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        writer.close()
+    else:
+        db = DatabaseHandler(db_name, wal=wal)
+        _write_loop(db, seconds, batch, counts)
+    db.close()
+    results.put(("writer", sum(c[0] for c in counts), sum(c[1] for c in counts)))
+
+
+def reader_process(db_name, seconds, wal, results):
+    db = DatabaseHandler(db_name, wal=wal)
+    ops = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            db.get_total_by_type("Expense")
+            db.get_category_expense("Food")
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    db.close()
+    results.put(("reader", ops, errors))
+
+
+def run(db_name, writers=4, readers=4, seconds=5.0, batch=50, wal=True, queue_threads=0):
+    DatabaseHandler(db_name, wal=wal).close()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=writer_process,
+                                args=(db_name, seconds, batch, wal, results, queue_threads))
+        for _ in range(writers)
+    ] + [
+        multiprocessing.Process(target=reader_process, args=(db_name, seconds, wal, results))
+        for _ in range(readers)
+    ]
+    start = time.perf_counter()
+    for p in processes:
+        p.start()
+    collected = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    report = {"wal": wal, "writer_queue_threads": queue_threads, "seconds": elapsed}
+    for role in ("writer", "reader"):
+        ops = sum(r[1] for r in collected if r[0] == role)
+        report[role] = {
+            "processes": sum(1 for r in collected if r[0] == role),
+            "ops": ops,
+            "ops_per_sec": ops / elapsed,
+            "errors": sum(r[2] for r in collected if r[0] == role),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent writer/reader stress test")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--batch", type=int, default=50, help="rows per write transaction")
+    parser.add_argument("--no-wal", action="store_true")
+    parser.add_argument("--writer-queue", action="store_true",
+                        help="also run with writer threads sharing one WriterQueue per process")
+    parser.add_argument("--threads", type=int, default=4,
+                        help="writer threads per process with --writer-queue")
+    parser.add_argument("--db", help="database file (default: a temp file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = args.db or os.path.join(tmp, "stress.db")
+        report = run(db_name, args.writers, args.readers, args.seconds,
+                     args.batch, wal=not args.no_wal)
+        if args.writer_queue:
+            report = {
+                "direct": report,
+                "writer_queue": run(db_name, args.writers, args.readers, args.seconds,
+                                    args.batch, wal=not args.no_wal, queue_threads=args.threads),
+            }
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from async_db import AsyncDataAccess, TkAsyncRunner
+from standin import LocalStudentStore
+
+
+class TestAsyncDataAccess(unittest.IsolatedAsyncioTestCase):
+
+    async def test_crud_round_trip(self):
+        data = AsyncDataAccess(LocalStudentStore())
+        student_id = await data.call("add", "Ali", 20, "A")
+        self.assertTrue(await data.call("update", student_id, "Ali Khan", 21, "B"))
+        self.assertEqual(await data.call("get_all"), [(student_id, "Ali Khan", 21, "B")])
+        self.assertTrue(await data.call("delete", student_id))
+        self.assertFalse(await data.call("delete", student_id))
+        data.close()
+
+    async def test_slow_calls_run_concurrently(self):
+        data = AsyncDataAccess(LocalStudentStore(latency=0.2), max_workers=4)
+        start = time.perf_counter()
+        await asyncio.gather(*(data.call("get_all") for _ in range(4)))
+        self.assertLess(time.perf_counter() - start, 0.6)
+        data.close()
+
+    async def test_cancelled_queued_call_never_runs(self):
+        store = LocalStudentStore(latency=0.2)
+        data = AsyncDataAccess(store, max_workers=1)
+        busy = asyncio.ensure_future(data.call("add", "First", 20, "A"))
+        queued = asyncio.ensure_future(data.call("add", "Never", 20, "A"))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await busy
+        names = [row[1] for row in await data.call("get_all")]
+        self.assertEqual(names, ["First"])
+        data.close()
+
+    async def test_open_creates_backend_before_queued_calls(self):
+        data = AsyncDataAccess()
+        opening = asyncio.ensure_future(data.open(LocalStudentStore, ":memory:", 0.1))
+        await asyncio.sleep(0)
+        self.assertEqual(await data.call("get_all"), [])
+        self.assertIsInstance(await opening, LocalStudentStore)
+
+        failing = AsyncDataAccess()
+        with self.assertRaises(ValueError):
+            await failing.open(int, "not a number")
+        with self.assertRaises(ValueError):
+            await failing.call("get_all")
+        data.close()
+        failing.close()
+
+    async def test_timeout(self):
+        data = AsyncDataAccess(LocalStudentStore(latency=0.5), timeout=0.05)
+        with self.assertRaises(asyncio.TimeoutError):
+            await data.call("get_all")
+        data.close()
+
+
+class StubRoot:
+    """Just enough of tk.Tk for TkAsyncRunner: after/after_cancel."""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.next_id = 0
+
+    def after(self, ms, func):
+        self.next_id += 1
+        self.scheduled[self.next_id] = func
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+
+class TestTkAsyncRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.root = StubRoot()
+        self.runner = TkAsyncRunner(self.root)
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_drain_runs_callbacks_on_calling_thread(self):
+        async def ok():
+            return 42
+
+        async def fail():
+            raise ValueError("boom")
+
+        results, errors, threads = [], [], []
+
+        def on_success(value):
+            results.append(value)
+            threads.append(threading.current_thread())
+
+        first = self.runner.submit(ok(), on_success, errors.append)
+        second = self.runner.submit(fail(), results.append, errors.append)
+        first.exception(timeout=1)
+        second.exception(timeout=1)
+        time.sleep(0.05)  # let the done callbacks enqueue
+        self.assertEqual(results, [])  # nothing runs until drain
+
+        self.runner.drain()
+        self.assertEqual(results, [42])
+        self.assertEqual([str(e) for e in errors], ["boom"])
+        self.assertEqual(threads, [threading.main_thread()])
+
+    def test_cancelled_futures_are_skipped(self):
+        calls = []
+        future = self.runner.submit(asyncio.sleep(10), calls.append, calls.append)
+        self.assertTrue(future.cancel())
+        time.sleep(0.05)
+        self.runner.drain()
+        self.assertEqual(calls, [])
+
+    def test_failing_callback_does_not_stop_polling(self):
+        reported, results = [], []
+        self.root.report_callback_exception = lambda *exc: reported.append(exc[0])
+
+        async def value(v):
+            return v
+
+        for future in (self.runner.submit(value(0), lambda v: 1 / v),
+                       self.runner.submit(value(2), results.append)):
+            future.result(timeout=1)
+        time.sleep(0.05)
+        (after_id, poll), = self.root.scheduled.items()
+        del self.root.scheduled[after_id]
+        poll()
+        self.assertEqual(reported, [ZeroDivisionError])
+        self.assertEqual(results, [2])
+        self.assertEqual(len(self.root.scheduled), 1)
+
+    def test_poll_reschedules_until_closed(self):
+        (after_id, poll), = self.root.scheduled.items()
+        del self.root.scheduled[after_id]
+        poll()
+        self.assertEqual(len(self.root.scheduled), 1)
+        self.runner.close()
+        self.assertEqual(self.root.scheduled, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
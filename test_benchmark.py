@@ -0,0 +1,21 @@
+import unittest
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_generators_are_reproducible(self):
+        first = list(benchmark.generate_transactions(50, seed=7))
+        second = list(benchmark.generate_transactions(50, seed=7))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, list(benchmark.generate_transactions(50, seed=8)))
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"1k/a": {"seconds": 1.0}, "1k/b": {"seconds": 1.0}}}
+        report = {"results": {"1k/a": {"seconds": 1.1}, "1k/b": {"seconds": 2.0}}}
+        regressions = benchmark.compare(report, baseline, tolerance=0.25)
+        self.assertEqual([r[0] for r in regressions], ["1k/b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from connection import CircuitBreaker, ConnectionManager, ConnectionSettings, ConnectionUnavailable, load_settings
+from standin import FakeODBCServers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestConnectionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = FakeODBCServers()
+        self.clock = FakeClock()
+        self.sleeps = []
+        settings = ConnectionSettings(servers=["primary", "backup"], login_timeout=1,
+                                      query_timeout=7, failure_threshold=2, reset_timeout=30)
+        self.manager = ConnectionManager(settings, connect=self.servers.connect,
+                                         sleep=self.sleeps.append, clock=self.clock)
+
+    def test_fails_over_and_sets_query_timeout(self):
+        self.servers.down.add("primary")
+        conn = self.manager.connect("GymDB", autocommit=True)
+        self.assertEqual(conn.server, "backup")
+        self.assertEqual(conn.timeout, 7)
+        self.assertTrue(conn.autocommit)
+        # The healthy server is tried first from now on
+        self.manager.connect()
+        self.assertEqual(self.servers.attempts, ["primary", "backup", "backup"])
+
+    def test_circuit_breaker_skips_then_retries_server(self):
+        self.servers.down.add("primary")
+        # Reset the preference so every call starts with the primary
+        for _ in range(2):
+            self.manager.preferred = None
+            self.manager.connect()
+        self.assertEqual(self.manager.breakers["primary"].state, "open")
+        self.manager.preferred = None
+        self.manager.connect()
+        self.assertEqual(self.servers.attempts.count("primary"), 2)
+
+        self.clock.now = 31
+        self.servers.down.clear()
+        self.manager.preferred = None
+        self.assertEqual(self.manager.connect().server, "primary")
+        self.assertEqual(self.manager.breakers["primary"].state, "closed")
+
+    def test_breaker_counts_concurrent_failures(self):
+        breaker = CircuitBreaker(failure_threshold=10 ** 9)
+
+        def fail():
+            for _ in range(5000):
+                breaker.record_failure()
+        threads = [threading.Thread(target=fail) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(breaker.failures, 40000)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_outage_backs_off_then_fails_fast(self):
+        self.servers.down.update({"primary", "backup"})
+        with self.assertRaises(ConnectionUnavailable):
+            self.manager.connect()
+        self.assertEqual(self.sleeps, [0.5, 1.0])
+        attempts = len(self.servers.attempts)
+        with self.assertRaises(ConnectionUnavailable):
+            self.manager.connect()
+        self.assertEqual(len(self.servers.attempts), attempts)
+
+    def test_slow_login_times_out(self):
+        self.servers.latency["primary"] = 5
+        self.manager.settings.login_timeout = 0.05
+        start = time.perf_counter()
+        self.assertEqual(self.manager.connect().server, "backup")
+        self.assertLess(time.perf_counter() - start, 1)
+
+
+class TestLoadSettings(unittest.TestCase):
+
+    def test_file_then_environment(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "db.ini")
+            with open(path, "w") as f:
+                f.write("[gym]\nservers = A, B\nlogin_timeout = 3\ntrusted_connection = no\n")
+            settings = load_settings("gym", ConnectionSettings(database="GymDB"), path=path,
+                                     environ={"GYM_DB_LOGIN_TIMEOUT": "9"})
+        self.assertEqual(settings.servers, ["A", "B"])
+        self.assertEqual(settings.login_timeout, 9)
+        self.assertFalse(settings.trusted_connection)
+        self.assertEqual(settings.database, "GymDB")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import tempfile
 import unittest
-from logic import Transaction
-from db import DatabaseHandler
+from datetime import date
+from logic import Transaction, BudgetManager, RecurringManager, RecurringRule, SavingsManager
+from db import DatabaseHandler, WriterQueue
+from journal import JournalError, OperationJournal
+import snapshot
+import stress
 
 
 class TestFinanceApp(unittest.TestCase):
@@ -19,6 +25,207 @@ class TestFinanceApp(unittest.TestCase):
         records = db.fetch_transactions()
         self.assertEqual(len(records), 1)
 
+    def test_wal_mode_enabled_for_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseHandler(os.path.join(tmp, "wal.db"))
+            mode = db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+            db.close()
+        self.assertEqual(mode, "wal")
+
+    def test_writer_queue_isolates_failing_jobs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "queue.db")
+            writer = WriterQueue(path)
+            db = DatabaseHandler(path, writer=writer)
+
+            def broken(cursor):
+                cursor.execute("INSERT INTO transactions (type, category, amount, date) VALUES ('Expense', 'Food', 1, '2025-01-01')")
+                raise RuntimeError("boom")
+
+            failed = writer.submit(broken)
+            db.add_transaction("Expense", "Food", 200, "2025-01-01")
+            with self.assertRaises(RuntimeError):
+                failed.result()
+            self.assertEqual(len(db.fetch_transactions()), 1)
+            writer.close()
+            db.close()
+        with self.assertRaises(ValueError):
+            WriterQueue(":memory:")
+
+    def test_concurrent_processes_do_not_lock(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = stress.run(os.path.join(tmp, "stress.db"), writers=2, readers=2, seconds=0.5, batch=10)
+        self.assertEqual(report["writer"]["errors"], 0)
+        self.assertEqual(report["reader"]["errors"], 0)
+        self.assertGreater(report["writer"]["ops"], 0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = stress.run(os.path.join(tmp, "stress.db"), writers=2, readers=1,
+                                seconds=0.5, batch=10, queue_threads=3)
+        self.assertEqual(report["writer"]["errors"], 0)
+        self.assertGreater(report["writer"]["ops"], 0)
+
+    def test_archived_transactions_stay_queryable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseHandler(os.path.join(tmp, "finance.db"))
+            db.add_transactions([
+                ("Income", "Salary", 1000, "2023-01-15"),
+                ("Expense", "Food", 100, "2023-02-10"),
+                ("Expense", "Food", 50, "2024-02-29"),
+                ("Expense", "Rent", 300, "2024-03-05"),
+                ("Expense", "Food", 25, "2025-06-01"),
+            ])
+            ranges = [(None, None), ("2023-02-01", "2024-02-29"),
+                      ("2023-02-11", "2024-03-04"), ("2024-03-01", None)]
+            before = [(db.get_total_by_type("Expense", s, e),
+                       db.get_category_expense("Food", s, e),
+                       db.fetch_transactions(s, e)) for s, e in ranges]
+
+            self.assertEqual(db.archive_before("2024-04-01"), 4)
+            self.assertEqual(len(db.conn.execute("SELECT * FROM transactions").fetchall()), 1)
+            after = [(db.get_total_by_type("Expense", s, e),
+                      db.get_category_expense("Food", s, e),
+                      db.fetch_transactions(s, e)) for s, e in ranges]
+            db.close()
+        self.assertEqual(before, after)
+
+    def test_snapshot_export_append_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "finance.snap")
+            db = DatabaseHandler(":memory:")
+            db.add_transactions([("Expense", "Food", 200, "2025-01-01"),
+                                 ("Income", "Salary", 5000, "2025-01-02")])
+            self.assertEqual(snapshot.export_snapshot(db, path, capacity=2), 2)
+            db.add_transactions([("Expense", "Rent", 900, "2025-02-01")] * 3000)
+            self.assertEqual(snapshot.append_snapshot(db, path), 3000)
+            db.add_transaction("Expense", "Travel", 10, "2025-03-01")
+            self.assertEqual(snapshot.append_snapshot(db, path), 1)
+            self.assertEqual(snapshot.append_snapshot(db, path), 0)
+
+            with snapshot.load_snapshot(path) as snap:
+                self.assertEqual(len(snap), 3003)
+                self.assertEqual(snap.last_id, 3003)
+                self.assertEqual(sum(snap.amount), 200 + 5000 + 900 * 3000 + 10)
+                self.assertEqual(snap.category_name(snap.category[3002]), "Travel")
+                self.assertEqual(snap.category_name(snap.category[2]), "Rent")
+                self.assertEqual(snap.type_name(snap.type[1]), "Income")
+                self.assertEqual(str(snap.to_date(snap.day[0])), "2025-01-01")
+            db.close()
+
+    def test_snapshot_includes_archived_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "finance.snap")
+            db = DatabaseHandler(os.path.join(tmp, "finance.db"))
+            db.add_transactions([("Expense", "Food", 100, "2023-01-10"),
+                                 ("Expense", "Food", 50, "2025-01-10")])
+            db.archive_before("2024-01-01")
+            self.assertEqual(snapshot.export_snapshot(db, path), 2)
+
+            # Added after the export and archived before the next append
+            db.add_transaction("Expense", "Rent", 300, "2023-05-01")
+            db.archive_before("2024-01-01")
+            self.assertEqual(snapshot.append_snapshot(db, path), 1)
+            with snapshot.load_snapshot(path) as snap:
+                self.assertEqual(sum(snap.amount), db.get_total_by_type("Expense"))
+                self.assertEqual(snap.last_id, 3)
+            db.close()
+
+    def test_journal_undo_redo_batches(self):
+        db = DatabaseHandler(":memory:")
+        journal = OperationJournal(db)
+        journal.add_transaction("Expense", "Food", 200, "2025-01-01")
+        with journal.batch("Import") as batch:
+            batch.add_transactions([("Expense", "Rent", 100, "2025-01-02")] * 50)
+            batch.set_budget("Rent", 1000)
+        journal.set_budget("Rent", 2000)
+
+        self.assertEqual(journal.undo(), "Budget Rent 2000")
+        self.assertEqual(db.get_budget("Rent"), (1000,))
+        self.assertEqual(journal.undo(), "Import")
+        self.assertEqual(len(db.fetch_transactions()), 1)
+        self.assertIsNone(db.get_budget("Rent"))
+
+        self.assertEqual(journal.redo(), "Import")
+        self.assertEqual(len(db.fetch_transactions()), 51)
+        self.assertEqual(db.get_category_expense("Rent"), 5000)
+
+        # A new batch drops what is left to redo
+        journal.add_transaction("Income", "Salary", 10, "2025-01-03")
+        self.assertIsNone(journal.redo())
+        self.assertEqual(db.get_budget("Rent"), (1000,))
+        with self.assertRaises(ValueError):
+            journal.import_transactions([("Expense", "Food", -1, "2025-01-04")])
+        db.close()
+
+    def test_journal_refuses_undo_of_archived_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseHandler(os.path.join(tmp, "finance.db"))
+            journal = OperationJournal(db)
+            journal.import_transactions([("Expense", "Food", 10, "2023-01-01"),
+                                         ("Expense", "Food", 20, "2025-01-01")])
+            db.archive_before("2024-01-01")
+            with self.assertRaises(JournalError):
+                journal.undo()
+            self.assertEqual(db.get_total_by_type("Expense"), 30)
+            self.assertEqual(journal.history()[0][3], 0)
+            db.close()
+
+    def test_recurring_rules_expand_on_demand(self):
+        rent = RecurringRule("Expense", "Rent", 500, "2025-01-31")
+        self.assertEqual(
+            [str(d) for d in rent.occurrences("2025-01-01", "2025-04-30")],
+            ["2025-01-31", "2025-02-28", "2025-03-31", "2025-04-30"]
+        )
+        gym = RecurringRule.from_rrule("Expense", "Other", 10, "2025-01-06", "FREQ=WEEKLY;INTERVAL=2;COUNT=3")
+        self.assertEqual([str(d) for d in gym.occurrences()], ["2025-01-06", "2025-01-20", "2025-02-03"])
+        self.assertEqual(gym.monthly_counts(date(2025, 1, 10), 3), [1, 1, 0])
+
+        db = DatabaseHandler(":memory:")
+        manager = RecurringManager(db)
+        manager.add_rule(rent)
+        manager.add_rule(RecurringRule("Income", "Salary", 2000, "2025-02-01", until="2025-12-31"))
+        self.assertEqual(manager.rules()[0].to_rrule(), "FREQ=MONTHLY")
+        rows = manager.transactions("2025-01-01", "2025-02-28")
+        self.assertEqual([r[3] for r in rows], ["2025-01-31", "2025-02-01", "2025-02-28"])
+        self.assertEqual(db.fetch_transactions(), [])
+
+        db.add_transaction("Income", "Salary", 1000, "2024-12-01")
+        projection = SavingsManager(db).project(13, "2025-01-15")
+        self.assertEqual(projection[0], ("2025-01", 0.0, 500.0, 500.0))
+        self.assertEqual(projection[1], ("2025-02", 2000.0, 500.0, 2000.0))
+        self.assertEqual(projection[-1], ("2026-01", 0.0, 500.0, 500 + 11 * 1500 - 500))
+        with self.assertRaises(ValueError):
+            RecurringRule.from_rrule("Expense", "Rent", 500, "2025-01-01", "FREQ=HOURLY")
+        with self.assertRaises(ValueError):
+            rent.count_between(None, None)
+        db.close()
+
+    def test_due_recurring_rules_count_in_budget_and_savings(self):
+        db = DatabaseHandler(":memory:")
+        manager = RecurringManager(db)
+        manager.add_rule(RecurringRule("Expense", "Rent", 500, "2020-01-01", count=4))
+        manager.add_rule(RecurringRule("Income", "Salary", 3000, "2020-01-01", count=2))
+        manager.add_rule(RecurringRule("Expense", "Rent", 100, "2999-01-01"))
+        db.add_transaction("Expense", "Rent", 50, "2020-01-02")
+
+        budgets = BudgetManager(db)
+        budgets.set_budget("Rent", 2000)
+        self.assertEqual(budgets.get_spent("Rent"), 2050)
+        self.assertTrue(budgets.is_over_budget("Rent"))
+        self.assertEqual(SavingsManager(db).calculate_savings(), 6000 - 2050)
+        self.assertEqual(SavingsManager(db).calculate_savings("2020-01-31"), 3000 - 550)
+        db.close()
+
+    def test_savings_as_of_excludes_later_transactions(self):
+        db = DatabaseHandler(":memory:")
+        db.add_transaction("Income", "Salary", 1000, "2020-01-10")
+        db.add_transaction("Expense", "Rent", 400, "2026-06-01")
+        savings = SavingsManager(db)
+        self.assertEqual(savings.calculate_savings("2020-01-31"), 1000)
+        self.assertEqual(savings.calculate_savings(date(2026, 6, 1)), 600)
+        self.assertEqual(savings.calculate_savings(), 600)
+        db.close()
+
 
 if __name__ == "__main__":
     unittest.main()
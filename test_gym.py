@@ -0,0 +1,204 @@
+import asyncio
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta
+
+from async_db import AsyncDataAccess
+from benchmark import MemberRow, generate_members, generate_trainers
+from dedup import DuplicateIndex, find_duplicates, normalize_phone, soundex
+from gym_stats import MembershipStats, age_band
+from gym_tasks import NoTrainers, build_duplicate_index, duplicate_report, plan_week
+from scheduler import IntervalIndex, ScheduleConflict, TrainerScheduler, week_slots
+from standin import LocalGymDatabase
+
+FEES = {"Basic": 1000, "Standard": 2000, "Premium": 3500}
+
+
+MEMBERS = [
+    (1, "Ali Khan", 25, "0310-1234567", "Basic", "2025-01-01"),
+    (2, "ali  khan", 25, "+92 310 1234567", "Basic", "2025-01-02"),
+    (3, "Alee Khan", 30, "03101234568", "Premium", "2025-01-03"),
+    (4, "Sara Khan", 22, "03101234567", "Standard", "2025-01-04"),
+    (5, "Omar Raza", 40, "03219999999", "Basic", "2025-01-05"),
+]
+
+
+class TestDedup(unittest.TestCase):
+
+    def test_normalization(self):
+        self.assertEqual(normalize_phone("+92 (310) 123-4567"), "923101234567")
+        self.assertEqual(soundex("robert"), soundex("rupert"))
+
+    def test_batch_report(self):
+        pairs = {(p.first_id, p.second_id) for p in find_duplicates(MEMBERS)}
+        self.assertIn((1, 2), pairs)
+        self.assertIn((1, 3), pairs)
+        self.assertNotIn((1, 4), pairs)
+        self.assertFalse(any(5 in pair for pair in pairs))
+
+    def test_index_check_at_insert(self):
+        index = DuplicateIndex(MEMBERS)
+        self.assertEqual(index.check("Ali Khan", "03101234567")[0][0], 1)
+        self.assertEqual(index.check("Omar Raza", "03000000000"), [])
+        index.remove(5)
+        self.assertEqual(index.check("Omar Raza", "03219999999"), [])
+
+
+class TestMembershipStats(unittest.TestCase):
+
+    def test_aggregates_match_rows_and_track_changes(self):
+        db = LocalGymDatabase()
+        db.add_members(generate_members(500, seed=3))
+        stats = MembershipStats.from_aggregates(FEES, db.get_membership_aggregates())
+
+        new_id = db.add_member(next(generate_members(1, seed=4)))
+        row = db.get_all_members()[-1]
+        stats.apply(row[2], row[4], row[5])
+        stats.apply(*db.delete_member(1), delta=-1)
+
+        rows = db.get_all_members()
+        self.assertEqual(rows[-1][0], new_id)
+        self.assertEqual(stats.total, len(rows))
+        self.assertEqual(stats.by_type, Counter(r[4] for r in rows))
+        self.assertEqual(stats.by_month, Counter(r[5][:7] for r in rows))
+        self.assertEqual(stats.by_age_band, Counter(age_band(r[2]) for r in rows))
+        self.assertEqual(stats.monthly_revenue, sum(FEES[r[4]] for r in rows))
+        db.close()
+
+
+class TestScheduler(unittest.TestCase):
+    WEEK = datetime(2026, 10, 26)
+
+    def test_interval_index_detects_overlaps(self):
+        index = IntervalIndex()
+        index.add(9, 10)
+        index.add(12, 14)
+        self.assertTrue(index.is_free(10, 12))
+        self.assertEqual([i[:2] for i in index.overlapping(9, 13)], [(9, 10), (12, 14)])
+        with self.assertRaises(ScheduleConflict):
+            index.add(13, 15)
+
+    def test_auto_assign_balances_without_overlaps(self):
+        trainers = [(1, "A", "Yoga"), (2, "B", "Yoga"), (3, "C", "Boxing")]
+        scheduler = TrainerScheduler(trainers)
+        slots = week_slots(self.WEEK, days=1)
+        requests = [(m, "Yoga") for m in range(20)] + [(0, "Boxing")]
+        booked, unplaced = scheduler.auto_assign(requests, slots)
+
+        self.assertEqual(unplaced, [])
+        self.assertEqual({scheduler.load(1), scheduler.load(2)}, {10})
+        member_zero = sorted((s.start, s.end) for s in booked if s.member_id == 0)
+        self.assertLessEqual(member_zero[0][1], member_zero[1][0])
+        with self.assertRaises(ScheduleConflict):
+            scheduler.book(3, 0, *member_zero[0])
+
+    def test_sessions_round_trip_through_database(self):
+        db = LocalGymDatabase()
+        db.add_members(generate_members(50, seed=5))
+        for trainer in generate_trainers(3, seed=5):
+            db.add_trainer(trainer)
+        scheduler = TrainerScheduler(db.get_all_trainers())
+        booked, _ = scheduler.auto_assign([(m[0], None) for m in db.get_all_members()],
+                                          week_slots(self.WEEK))
+        db.add_sessions(booked)
+
+        stored = db.get_sessions(self.WEEK, self.WEEK + timedelta(days=7))
+        self.assertEqual(sorted(stored), sorted(tuple(s) for s in booked))
+        TrainerScheduler(db.get_all_trainers(), stored)
+        db.close()
+
+    def test_stored_overlaps_load_but_new_ones_are_refused(self):
+        nine = self.WEEK + timedelta(hours=9)
+        hour = timedelta(hours=1)
+        stored = [(1, 10, nine, nine + hour), (1, 11, nine + hour / 2, nine + 2 * hour)]
+        scheduler = TrainerScheduler([(1, "T", "Yoga")], stored)
+        self.assertEqual(len(scheduler.conflicts(1, 12, nine + 1.5 * hour, nine + 3 * hour)), 1)
+        with self.assertRaises(ScheduleConflict):
+            scheduler.book(1, 12, nine + 1.5 * hour, nine + 3 * hour)
+        scheduler.book(1, 12, nine + 2 * hour, nine + 3 * hour)
+
+        index = IntervalIndex()
+        index.add(0, 10)
+        index.add(2, 3, strict=False)
+        self.assertFalse(index.is_free(5, 6))
+        self.assertTrue(index.is_free(10, 11))
+
+    def test_database_skips_sessions_that_overlap_stored_ones(self):
+        db = LocalGymDatabase()
+        nine = self.WEEK + timedelta(hours=9)
+        hour = timedelta(hours=1)
+        first = (1, 10, nine, nine + hour)
+        self.assertEqual(db.add_sessions([first]), [first])
+        clash_trainer = (1, 11, nine + hour / 2, nine + 2 * hour)
+        clash_member = (2, 10, nine, nine + hour)
+        free = (2, 11, nine, nine + hour)
+        self.assertEqual(db.add_sessions([clash_trainer, clash_member, free]), [free])
+        self.assertEqual(sorted(db.get_sessions(self.WEEK, self.WEEK + timedelta(days=1))),
+                         sorted([first, free]))
+        db.close()
+
+
+class TestGymAsync(unittest.IsolatedAsyncioTestCase):
+    """Gym Database methods and tasks driven through AsyncDataAccess."""
+
+    WEEK = datetime(2026, 10, 26)
+
+    async def asyncSetUp(self):
+        self.data = AsyncDataAccess(max_workers=4)
+        await self.data.open(LocalGymDatabase)
+
+    async def asyncTearDown(self):
+        await self.data.call("close")
+        self.data.close()
+
+    async def test_member_calls_from_worker_threads(self):
+        rows = [MemberRow(m[1], m[2], m[3], m[4], m[5]) for m in MEMBERS]
+        ids = await asyncio.gather(*(self.data.call("add_member", r) for r in rows))
+        self.assertEqual(sorted(ids), [1, 2, 3, 4, 5])
+        self.assertEqual(len(await self.data.call("search_members", "Khan")), 4)
+
+        removed = await self.data.call("delete_member", 5)
+        self.assertEqual(removed, (40, "Basic", "2025-01-05"))
+        members = await self.data.call("get_all_members")
+        self.assertEqual([m[0] for m in members], [1, 2, 3, 4])
+        aggregates = await self.data.call("get_membership_aggregates")
+        self.assertEqual(aggregates["by_type"], {"Basic": 2, "Premium": 1, "Standard": 1})
+
+    async def test_duplicate_tasks(self):
+        await self.data.call("add_members", [MemberRow(*m[1:]) for m in MEMBERS])
+        report = await duplicate_report(self.data)
+        self.assertIn((1, "Ali Khan", 2, "ali  khan"), [r[:4] for r in report])
+        index = await build_duplicate_index(self.data)
+        self.assertIsInstance(index, DuplicateIndex)
+
+    async def test_plan_week(self):
+        await self.data.call("add_members", generate_members(30, seed=9))
+        with self.assertRaises(NoTrainers):
+            await plan_week(self.data, self.WEEK)
+
+        for trainer in generate_trainers(2, seed=9):
+            await self.data.call("add_trainer", trainer)
+        self.assertEqual(await plan_week(self.data, self.WEEK), (30, 0))
+        # Everyone already has a session, so a second run books nothing
+        self.assertEqual(await plan_week(self.data, self.WEEK), (0, 0))
+        stored = await self.data.call("get_sessions", self.WEEK, self.WEEK + timedelta(days=7))
+        self.assertEqual(len(stored), 30)
+
+    async def test_concurrent_plans_never_store_overlaps(self):
+        await self.data.call("add_members", generate_members(20, seed=3))
+        for trainer in generate_trainers(2, seed=3):
+            await self.data.call("add_trainer", trainer)
+        # Both plans read the same empty week before either saves
+        results = await asyncio.gather(plan_week(self.data, self.WEEK),
+                                       plan_week(self.data, self.WEEK))
+        self.assertEqual(sum(booked for booked, _ in results), 20)
+
+        stored = await self.data.call("get_sessions", self.WEEK, self.WEEK + timedelta(days=7))
+        scheduler = TrainerScheduler(await self.data.call("get_all_trainers"))
+        for session in stored:
+            scheduler.book(*session)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import atexit
+import json
+import os
+import tempfile
+import tkinter
+import unittest
+
+from profiling import Tracer
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "trace.json")
+        self.tracer = Tracer()
+
+    def tearDown(self):
+        atexit.unregister(self.tracer.write)
+        self.tmp.cleanup()
+
+    def test_disabled_by_default(self):
+        self.assertEqual(self.tracer.configure(["--db", "x.db"], environ={}), ["--db", "x.db"])
+        self.assertFalse(self.tracer.enabled)
+        with self.tracer.span("db init"):
+            pass
+        self.assertEqual(self.tracer.events, [])
+
+    def test_flags_and_env(self):
+        rest = self.tracer.configure(["--profile", self.path, "--headless"], environ={})
+        self.assertEqual(rest, ["--headless"])
+        self.assertEqual(self.tracer.path, self.path)
+
+        bare = Tracer()
+        self.assertEqual(bare.configure(["--profile", "--headless"], environ={}), ["--headless"])
+        atexit.unregister(bare.write)
+        self.assertEqual(bare.path, "trace.json")
+
+        other = Tracer()
+        other.configure([], environ={"SCD_PROFILE": "env.json"})
+        atexit.unregister(other.write)
+        self.assertEqual(other.path, "env.json")
+
+    def test_spans_written_as_chrome_trace(self):
+        self.tracer.configure([f"--profile={self.path}"], environ={})
+        self.tracer.mark("import")
+        with self.tracer.span("db init"):
+            pass
+        for _ in range(2):
+            with self.tracer.once("first query"):
+                pass
+        self.tracer.write()
+
+        with open(self.path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual([e["name"] for e in events], ["import", "db init", "first query"])
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+
+    def test_callback_hook_profiles_tk_callbacks(self):
+        original = tkinter.CallWrapper.__call__
+        self.addCleanup(setattr, tkinter.CallWrapper, "__call__", original)
+        self.tracer.configure(["--profile", self.path, "--profile-callbacks"], environ={})
+
+        def on_click(x):
+            return x * 2
+
+        self.assertEqual(tkinter.CallWrapper(on_click, None, None)(21), 42)
+        self.tracer.write()
+        self.assertEqual(len(self.tracer.events), 1)
+        self.assertTrue(self.tracer.events[0]["name"].endswith("on_click"))
+        self.assertTrue(os.path.exists(self.path + ".prof"))
+
+
+if __name__ == "__main__":
+    unittest.main()
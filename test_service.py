@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from db import DatabaseHandler
+from service import FinanceService, start_server
+
+
+class TestFinanceService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = FinanceService(os.path.join(self.tmp.name, "test.db"), pool_size=2)
+        self.server = await start_server(self.service, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.service.close()
+        self.tmp.cleanup()
+
+    async def request(self, method, path, payload=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps(payload) if payload is not None else ""
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n{body}".encode()
+        )
+        raw = await reader.read()
+        writer.close()
+        head, _, content = raw.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(content)
+
+    async def test_concurrent_inserts_are_batched_and_visible(self):
+        await asyncio.gather(*(
+            self.service.add_transaction("Expense", "Food", 10) for _ in range(50)
+        ))
+        await self.service.add_transaction("Income", "Salary", 1000)
+        status, body = await self.request("GET", "/savings")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["savings"], 500)
+
+    async def test_http_budget_and_validation(self):
+        status, _ = await self.request("POST", "/budgets", {"category": "Food", "amount": 5})
+        self.assertEqual(status, 201)
+        await self.request("POST", "/transactions", {"type": "Expense", "category": "Food", "amount": 20})
+        status, body = await self.request("GET", "/budgets/Food")
+        self.assertTrue(body["over_budget"])
+
+        status, body = await self.request("POST", "/transactions", {"type": "Expense", "category": "Food", "amount": -1})
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error"], "Amount must be positive")
+
+    async def test_bad_rows_fail_only_their_own_request(self):
+        results = await asyncio.gather(
+            *(self.request("POST", "/transactions", {"type": "Expense", "category": "Food", "amount": 5})
+              for _ in range(5)),
+            self.request("POST", "/transactions", {"type": "Expense", "amount": 5}),
+            self.request("POST", "/transactions", {"type": "Expense", "category": "Food", "amount": 5, "date": "2024-13-45"}),
+            self.request("POST", "/transactions", {"type": "Expense", "category": "Food", "amount": 5, "date": "yesterday"}),
+        )
+        self.assertEqual([status for status, _ in results], [201] * 5 + [400] * 3)
+
+        # A row that fails inside the write transaction is isolated too
+        def broken(cursor):
+            cursor.execute("INSERT INTO transactions (type, category, amount, date) VALUES ('Expense', NULL, 1, '2025-01-01')")
+        failed = self.service.writer_queue.submit(broken)
+        await self.service.add_transaction("Expense", "Food", 5, "2025-01-01")
+        with self.assertRaises(Exception):
+            await asyncio.wrap_future(failed)
+        status, body = await self.request("GET", "/transactions")
+        self.assertEqual(len(body), 6)
+
+    async def test_close_writes_queued_transactions(self):
+        path = os.path.join(self.tmp.name, "close.db")
+        service = FinanceService(path, pool_size=1)
+        await service.start()
+        pending = [asyncio.create_task(service.add_transaction("Expense", "Food", 10)) for _ in range(20)]
+        await asyncio.sleep(0)
+        await service.close()
+        await asyncio.wait_for(asyncio.gather(*pending), timeout=5)
+
+        db = DatabaseHandler(path)
+        self.assertEqual(db.get_total_by_type("Expense"), 200)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()